@@ -1,132 +1,341 @@
+import asyncio
+import httpx
+import orjson
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, UploadFile, File
-from typing import Dict, List, Any, Optional
-from .models.schemas import AnalysisRequest, Policy
-from .services import dependency_extractor, package_info, repo_health
-from .services.repo_health import GITHUB_TOKEN, GITLAB_TOKEN
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import AsyncIterator, Callable, Dict, FrozenSet, List, Any, Optional, Tuple
+from .models.schemas import AnalysisRequest, HealthCheckResult, Policy
+from .services import dependency_extractor, http_client, package_index, package_info, repo_health
 from core.models import Dependency
 
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    Defined here rather than imported from FastAPI, whose ORJSONResponse is
+    deprecated in newer releases. Analysis results are plain dicts of
+    primitives, so they are serialized directly without jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+# Manifests larger than this are parsed off the event loop thread
+INLINE_PARSE_MAX_CHARS = 64 * 1024
+
+# Maximum number of in-flight requests per upstream host (keeps us clear of secondary rate limits)
+HOST_CONCURRENCY = 16
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Open the shared outbound HTTP client and per-host limits for the lifetime of the app.
+
+    Args:
+        app: The FastAPI application whose state holds the shared resources.
+    """
+    async with http_client.create_client() as client:
+        app.state.http = client
+        app.state.host_limits = {
+            host: asyncio.Semaphore(HOST_CONCURRENCY) for host in ("pypi", "npm", "github", "gitlab")
+        }
+        yield
+
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
-@app.post("/v1/analyze")
-def analyze(request: AnalysisRequest) -> Dict[str, List[Dict[str, Any]]]:
-    """Analyze manifest content to extract dependencies and check repository health.
+# Uploaded manifest filenames and the manifest type each one maps to
+MANIFEST_FILENAMES: Dict[str, str] = {
+    "requirements.txt": "requirements.txt",
+    "package.json": "package.json",
+    "pyproject.toml": "pyproject.toml",
+    "environment.yml": "environment.yml",
+    "environment.yaml": "environment.yml",
+    "poetry.lock": "poetry.lock"
+}
 
-    Extracts dependencies from the provided manifest content, fetches package information
-    from appropriate registries (PyPI/npm), and performs repository health checks for
-    supported platforms (GitHub/GitLab).
+# Manifest types and the extractor that parses each one
+MANIFEST_EXTRACTORS: Dict[str, Callable[[str], List[Dependency]]] = {
+    'requirements.txt': dependency_extractor.extract_requirements_txt_from_content,
+    'package.json': dependency_extractor.extract_package_json_from_content,
+    'pyproject.toml': dependency_extractor.extract_pyproject_toml_from_content,
+    'environment.yml': dependency_extractor.extract_environment_yml_from_content,
+    'poetry.lock': dependency_extractor.extract_poetry_lock_from_content
+}
+
+# Dependency sources whose packages are looked up on PyPI
+PYPI_SOURCES: FrozenSet[str] = frozenset({'pypi', 'poetry', 'poetry.lock', 'pip', 'conda'})
+
+async def _check_repo_health(client: httpx.AsyncClient, platform: str, org: str, repo: str, policy: Policy) -> Dict[str, Any]:
+    """Run a repository health check within the platform's concurrency limit.
 
     Args:
-        request: The analysis request containing manifest content, type, and policy.
+        client: Shared HTTP client used for all outbound requests.
+        platform: Hosting platform, either 'github' or 'gitlab'.
+        org: Organization or group that owns the repository.
+        repo: Repository name.
+        policy: Health policy to enforce.
 
     Returns:
-        Dictionary containing a 'results' key with a list of analysis results for each
-        dependency. Each result includes dependency name, package info, and health data.
-
-    Raises:
-        HTTPException: If the manifest type is not supported (status 400).
+        The health check result for the repository, dumped to JSON-ready primitives
+        once so every dependency sharing the repository reuses the same dict.
     """
-    # 1. Extract dependencies from manifest content
-    manifest_type = request.manifest_type.lower()
-    content = request.manifest_content
+    async with app.state.host_limits[platform]:
+        health: HealthCheckResult = await repo_health.check_health(client, platform, org, repo, policy)
+    return health.model_dump(mode="json")
 
-    # Map manifest types to their respective extractor functions
-    extractor_map: Dict[str, Any] = {
-        'requirements.txt': dependency_extractor.extract_requirements_txt_from_content,
-        'package.json': dependency_extractor.extract_package_json_from_content,
-        'pyproject.toml': dependency_extractor.extract_pyproject_toml_from_content,
-        'environment.yml': dependency_extractor.extract_environment_yml_from_content,
-        'poetry.lock': dependency_extractor.extract_poetry_lock_from_content
+def _package_summary(
+    summary: Optional[str],
+    repo_info: Tuple[Optional[str], Optional[str], Optional[str], Optional[str]],
+    latest_version: Optional[str],
+    created_date: Optional[str]
+) -> Dict[str, Any]:
+    """Build the package_info section of a dependency's analysis result.
+
+    Args:
+        summary: Short package description from the registry.
+        repo_info: (repo_url, platform, org, repo) as returned by the repo info extractors.
+        latest_version: Latest released version.
+        created_date: Release date of the latest version.
+
+    Returns:
+        The package info dictionary.
+    """
+    repo_url, platform, org, repo = repo_info
+    return {
+        "summary": summary,
+        "repository_url": repo_url,
+        "repository_platform": platform,
+        "repository_org": org,
+        "repository_name": repo,
+        "latest_version": latest_version,
+        "created_date": created_date
     }
 
-    if manifest_type not in extractor_map:
-        # Raise error if manifest type is not supported
-        raise HTTPException(status_code=400, detail=f"Unsupported manifest type: {manifest_type}")
+async def process_dep(
+    dep: Dependency,
+    client: httpx.AsyncClient,
+    policy: Policy,
+    health_tasks: Dict[Tuple[str, str, str], "asyncio.Task[Dict[str, Any]]"]
+) -> Dict[str, Any]:
+    """Fetch package info and repository health for a single dependency.
 
-    # Extract dependencies using the appropriate extractor
-    dependencies: List[Dependency] = extractor_map[manifest_type](content)
-    results: List[Dict[str, Any]] = []
+    Args:
+        dep: The dependency to analyze.
+        client: Shared HTTP client used for all outbound requests.
+        policy: Health policy to enforce for the repository check.
+        health_tasks: Health checks already started for this request, keyed by
+            (platform, org, repo), so dependencies sharing a repository share one check.
 
-    for dep in dependencies:
-        # 2. Get package info and repo URL
-        if dep.source in ['pypi', 'poetry', 'poetry.lock', 'pip', 'conda']:
-            # For 'conda' and 'pip', treat as PyPI package if possible
-            info = package_info.get_library_info(dep.name)
+    Returns:
+        The analysis result for the dependency.
+    """
+    host_limits: Dict[str, asyncio.Semaphore] = app.state.host_limits
+    # 2. Get package info and repo URL
+    if dep.source in PYPI_SOURCES:
+        # For 'conda' and 'pip', treat as PyPI package if possible
+        # PyPI redirects the PEP 503 name of a mixed-case project (e.g. Django) to its
+        # display name; the shared client follows that redirect
+        pypi_name = package_info.canonicalize_pypi_name(dep.name)
+        # A fresh entry in the persistent index skips the PyPI metadata fetch entirely;
+        # sqlite calls run on a worker thread so disk I/O doesn't stall the event loop,
+        # and are skipped outright when no index is configured
+        index_enabled = package_index.enabled()
+        package_info_out = await asyncio.to_thread(package_index.lookup, pypi_name) if index_enabled else None
+        if package_info_out is None:
+            async with host_limits["pypi"]:
+                info = await package_info.get_library_info(client, pypi_name)
             if not info:
                 # For conda, clarify it may be a conda-only or system package
                 if dep.source == 'conda':
-                    results.append({
+                    return {
                         "dependency": dep.name,
                         "error": True,
                         "message": f"Could not fetch info for {dep.name} from PyPI. This may be a conda-only or system package."
-                    })
-                else:
-                    results.append({
-                        "dependency": dep.name,
-                        "error": True,
-                        "message": f"Could not fetch info for {dep.name} from PyPI"
-                    })
-                continue
-            package_info_data = info.get("info", {})
-            repo_url, platform, org, repo = package_info.extract_repo_info(package_info_data)
-        elif dep.source == 'npm':
-            info = package_info.get_npm_info(dep.name)
-            if not info:
-                results.append({
+                    }
+                return {
                     "dependency": dep.name,
                     "error": True,
-                    "message": f"Could not fetch info for {dep.name} from npmjs.org"
-                })
-                continue
-            repo_url, platform, org, repo = package_info.extract_npm_repo_info(info)
-        else:
-            results.append({
+                    "message": f"Could not fetch info for {dep.name} from PyPI"
+                }
+            package_info_data = info.get("info", {})
+            package_info_out = _package_summary(
+                package_info_data.get("summary"),
+                package_info.extract_repo_info(package_info_data),
+                package_info_data.get("version"),
+                package_info.get_latest_version_release_date(info)
+            )
+            if index_enabled:
+                await asyncio.to_thread(package_index.record, pypi_name, package_info_out)
+    elif dep.source == 'npm':
+        async with host_limits["npm"]:
+            info = await package_info.get_npm_info(client, dep.name)
+        if not info:
+            return {
                 "dependency": dep.name,
                 "error": True,
-                "message": f"Unsupported dependency source: {dep.source}"
-            })
-            continue
-
-        # 3. If repo URL found, check health
-        if platform in ["github", "gitlab"] and org and repo:
-            # Check health for supported platforms
-            if platform == "github":
-                health = repo_health.check_github_health(org, repo, request.policy, token=GITHUB_TOKEN)
-            elif platform == "gitlab":
-                health = repo_health.check_gitlab_health(org, repo, request.policy, token=GITLAB_TOKEN)
-            results.append({
-                "dependency": dep.name,
-                "package_info": {
-                    "summary": package_info_data.get("summary") if dep.source != 'npm' else info.get("description"),
-                    "repository_url": repo_url,
-                    "repository_platform": platform,
-                    "repository_org": org,
-                    "repository_name": repo,
-                    "latest_version": package_info_data.get("version") if dep.source != 'npm' else info.get("dist-tags", {}).get("latest"),
-                    "created_date": package_info.get_latest_version_release_date(info) if dep.source != 'npm' else info.get("time", {}).get(info.get("dist-tags", {}).get("latest"))
-                },
-                "health": health.model_dump()
-            })
-        else:
-            # If no supported repo URL, return package info without health
-            results.append({
-                "dependency": dep.name,
-                "package_info": {
-                    "summary": package_info_data.get("summary") if dep.source != 'npm' else info.get("description"),
-                    "repository_url": repo_url,
-                    "repository_platform": platform,
-                    "repository_org": org,
-                    "repository_name": repo,
-                    "latest_version": package_info_data.get("version") if dep.source != 'npm' else info.get("dist-tags", {}).get("latest"),
-                    "created_date": package_info.get_latest_version_release_date(info) if dep.source != 'npm' else info.get("time", {}).get(info.get("dist-tags", {}).get("latest"))
-                },
-                "health": None,
-                "message": "No supported repository URL found for health check."
-            })
-    return {"results": results}
+                "message": f"Could not fetch info for {dep.name} from npmjs.org"
+            }
+        latest_version = info.get("dist-tags", {}).get("latest")
+        package_info_out = _package_summary(
+            info.get("description"),
+            package_info.extract_npm_repo_info(info),
+            latest_version,
+            info.get("time", {}).get(latest_version)
+        )
+    else:
+        return {
+            "dependency": dep.name,
+            "error": True,
+            "message": f"Unsupported dependency source: {dep.source}"
+        }
+    platform = package_info_out["repository_platform"]
+    org = package_info_out["repository_org"]
+    repo = package_info_out["repository_name"]
+
+    # 3. If repo URL found, check health
+    if platform in ["github", "gitlab"] and org and repo:
+        # Check health for supported platforms, once per repository
+        key = (platform, org, repo)
+        task = health_tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(_check_repo_health(client, platform, org, repo, policy))
+            health_tasks[key] = task
+        # Shield so one cancelled dependency doesn't abort the check for the others sharing it
+        health = await asyncio.shield(task)
+        return {
+            "dependency": dep.name,
+            "package_info": package_info_out,
+            "health": health
+        }
+    # If no supported repo URL, return package info without health
+    return {
+        "dependency": dep.name,
+        "package_info": package_info_out,
+        "health": None,
+        "message": "No supported repository URL found for health check."
+    }
+
+async def _extract_dependencies(request: AnalysisRequest) -> List[Dependency]:
+    """Extract the dependencies from an analysis request's manifest content.
+
+    Args:
+        request: The analysis request containing manifest content and type.
+
+    Returns:
+        The dependencies declared in the manifest, in manifest order.
+
+    Raises:
+        HTTPException: If the manifest type is not supported (status 400).
+    """
+    manifest_type = request.manifest_type.lower()
+    content = request.manifest_content
+
+    if manifest_type not in MANIFEST_EXTRACTORS:
+        # Raise error if manifest type is not supported
+        raise HTTPException(status_code=400, detail=f"Unsupported manifest type: {manifest_type}")
+
+    # Extract dependencies using the appropriate extractor; large manifests are
+    # parsed in a worker thread so they don't stall other requests on the loop
+    extractor = MANIFEST_EXTRACTORS[manifest_type]
+    if len(content) > INLINE_PARSE_MAX_CHARS:
+        return await asyncio.to_thread(extractor, content)
+    return extractor(content)
+
+async def _analyze_dep(
+    dep: Dependency,
+    client: httpx.AsyncClient,
+    policy: Policy,
+    health_tasks: Dict[Tuple[str, str, str], "asyncio.Task[Dict[str, Any]]"]
+) -> Dict[str, Any]:
+    """Analyze a single dependency, reporting any failure as an error result.
+
+    Args:
+        dep: The dependency to analyze.
+        client: Shared HTTP client used for all outbound requests.
+        policy: Health policy to enforce for the repository check.
+        health_tasks: Health checks already started for this request.
+
+    Returns:
+        The analysis result for the dependency, or an error entry if analysis failed.
+    """
+    try:
+        return await process_dep(dep, client, policy, health_tasks)
+    except Exception as e:
+        return {
+            "dependency": dep.name,
+            "error": True,
+            "message": f"Error analyzing {dep.name}: {e}"
+        }
+
+@app.post("/v1/analyze")
+async def analyze(request: AnalysisRequest) -> ORJSONResponse:
+    """Analyze manifest content to extract dependencies and check repository health.
+
+    Extracts dependencies from the provided manifest content, fetches package information
+    from appropriate registries (PyPI/npm), and performs repository health checks for
+    supported platforms (GitHub/GitLab).
+
+    Args:
+        request: The analysis request containing manifest content, type, and policy.
+
+    Returns:
+        JSON response with a 'results' key holding a list of analysis results for each
+        dependency. Each result includes dependency name, package info, and health data.
+
+    Raises:
+        HTTPException: If the manifest type is not supported (status 400).
+    """
+    # 1. Extract dependencies from manifest content
+    dependencies: List[Dependency] = await _extract_dependencies(request)
+
+    # Fan out the per-dependency lookups; results keep manifest order
+    client: httpx.AsyncClient = app.state.http
+    health_tasks: Dict[Tuple[str, str, str], "asyncio.Task[Dict[str, Any]]"] = {}
+    results: List[Dict[str, Any]] = await asyncio.gather(
+        *(_analyze_dep(dep, client, request.policy, health_tasks) for dep in dependencies)
+    )
+    return ORJSONResponse({"results": results})
+
+@app.post("/v1/analyze/stream")
+async def analyze_stream(request: AnalysisRequest) -> StreamingResponse:
+    """Analyze manifest content, streaming each dependency's result as soon as it is ready.
+
+    Performs the same analysis as the /v1/analyze endpoint, but responds with
+    newline-delimited JSON: one result object per line, in completion order rather
+    than manifest order, so clients can start consuming before the slowest lookup ends.
+
+    Args:
+        request: The analysis request containing manifest content, type, and policy.
+
+    Returns:
+        Streaming NDJSON response with one analysis result per line.
+
+    Raises:
+        HTTPException: If the manifest type is not supported (status 400).
+    """
+    dependencies: List[Dependency] = await _extract_dependencies(request)
+    client: httpx.AsyncClient = app.state.http
+
+    async def results() -> AsyncIterator[bytes]:
+        health_tasks: Dict[Tuple[str, str, str], "asyncio.Task[Dict[str, Any]]"] = {}
+        tasks = [
+            asyncio.create_task(_analyze_dep(dep, client, request.policy, health_tasks))
+            for dep in dependencies
+        ]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield orjson.dumps(await done) + b"\n"
+        finally:
+            # Stop outstanding lookups if the client disconnects mid-stream; only this
+            # stream's own tasks are cancelled, while registry fetches shared with other
+            # requests stay shielded in package_info
+            for task in [*tasks, *health_tasks.values()]:
+                task.cancel()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
 
 @app.post("/v1/analyze/file")
-def post_file(file: UploadFile = File(...)) -> Dict[str, List[Dict[str, Any]]]:
+async def post_file(file: UploadFile = File(...)) -> ORJSONResponse:
     """Analyze an uploaded manifest file.
 
     Automatically infers the manifest type from the filename and performs the same
@@ -136,7 +345,7 @@ def post_file(file: UploadFile = File(...)) -> Dict[str, List[Dict[str, Any]]]:
         file: The uploaded manifest file to analyze.
 
     Returns:
-        Dictionary containing analysis results for the uploaded file.
+        JSON response containing analysis results for the uploaded file.
 
     Raises:
         HTTPException: If the manifest type cannot be inferred from filename (status 400).
@@ -145,27 +354,21 @@ def post_file(file: UploadFile = File(...)) -> Dict[str, List[Dict[str, Any]]]:
     if file.filename is None:
         raise HTTPException(status_code=400, detail="No filename provided")
     filename: str = file.filename.lower()
-    manifest_type_map: Dict[str, str] = {
-        "requirements.txt": "requirements.txt",
-        "package.json": "package.json",
-        "pyproject.toml": "pyproject.toml",
-        "environment.yml": "environment.yml",
-        "environment.yaml": "environment.yml",
-        "poetry.lock": "poetry.lock"
-    }
-
-    manifest_type: Optional[str] = None
-    for ext, type_name in manifest_type_map.items():
-        if filename.endswith(ext):
-            manifest_type = type_name
-            break
+    basename: str = filename.rsplit('/', 1)[-1]
+    manifest_type: Optional[str] = MANIFEST_FILENAMES.get(basename)
+    if manifest_type is None:
+        # Fall back to suffix matching for prefixed names such as 'dev-requirements.txt'
+        manifest_type = next((type_name for ext, type_name in MANIFEST_FILENAMES.items() if basename.endswith(ext)), None)
 
     if not manifest_type:
         # Raise error if manifest type cannot be inferred
         raise HTTPException(status_code=400, detail=f"Could not infer manifest type from filename: {filename}")
 
     # Read file content and create default policy
-    content: str = file.file.read().decode("utf-8")
+    content_bytes: bytes = await file.read()
+    content: str = content_bytes.decode("utf-8")
+    # Drop the raw upload so only the decoded text stays alive during analysis
+    del content_bytes
     policy: Policy = Policy()
     request: AnalysisRequest = AnalysisRequest(manifest_content=content, manifest_type=manifest_type, policy=policy)
-    return analyze(request)
\ No newline at end of file
+    return await analyze(request)
\ No newline at end of file
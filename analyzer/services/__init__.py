@@ -2,8 +2,10 @@
 This module exposes the main service modules for dependency extraction, package info, and repository health checks.
 """
 from . import dependency_extractor   # Functions for extracting dependencies from manifests
+from . import http_client            # Factory for the shared outbound HTTP client
+from . import package_index          # Persistent on-disk index of package summaries
 from . import package_info           # Functions for fetching and parsing package metadata
 from . import repo_health            # Functions for checking repository health
 
 # Expose all main service modules for import
-__all__ = ['dependency_extractor', 'package_info', 'repo_health']
\ No newline at end of file
+__all__ = ['dependency_extractor', 'http_client', 'package_index', 'package_info', 'repo_health']
\ No newline at end of file
@@ -1,57 +1,99 @@
 import re
-import json
-import toml
-import yaml
-from typing import List, Dict, Any, Union
+import sys
+import functools
+import orjson
+from typing import Callable, List, Dict, Any, Union
 from core.models import Dependency
 
-def extract_requirements_txt_from_content(content: str) -> List[Dependency]:
+# TOML and YAML parsers are imported on first use, so workers that only see
+# requirements.txt or package.json manifests never load them
+
+# One requirements.txt line, stripped: the whole entry, then its name and version spec when it has an
+# operator. Blank lines and comments never match, so one findall pass visits only entries
+_REQ_LINE_RE = re.compile(
+    r'^[^\S\n]*('
+    r'(?:([^#\s=<>~!](?:[^=<>~!\n]*[^=<>~!\s])?)[^\S\n]*[=<>~!]+[^\S\n]*(\S(?:.*\S)?)'
+    r'|[^#\s](?:.*\S)?)'
+    r')[^\S\n]*$',
+    re.M,
+)
+# The only poetry.lock lines the parser needs: package headers and name/version/category keys
+_POETRY_LOCK_LINE_RE = re.compile(r'^(?:\[\[package\]\][ \t\r]*|(name|version|category) = (.*))$', re.M)
+
+# Upper bound on parsed manifests kept per extractor; the least recently stored entry is evicted first
+PARSE_CACHE_MAXSIZE = 256
+
+class _ContentMemo:
+    """
+    Cache an extractor's results by manifest content, so the same manifest is parsed only once.
+    Calling it returns a fresh list every time; cache_clear() empties the cache.
+    """
+
+    def __init__(self, extract: Callable[[str, bool], List[Dependency]]) -> None:
+        functools.update_wrapper(self, extract)
+        # lru_cache is safe to share across the worker threads extraction runs on
+        self._parse = functools.lru_cache(maxsize=PARSE_CACHE_MAXSIZE)(
+            lambda content, include_raw: tuple(extract(content, include_raw))
+        )
+
+    def __call__(self, content: str, include_raw: bool = False) -> List[Dependency]:
+        # Dependency objects are frozen, so only the list needs copying
+        return list(self._parse(content, include_raw))
+
+    def cache_clear(self) -> None:
+        self._parse.cache_clear()
+
+@_ContentMemo
+def extract_requirements_txt_from_content(content: str, include_raw: bool = False) -> List[Dependency]:
     """
     Parse a requirements.txt file content and extract dependencies as Dependency objects.
     Args:
         content (str): The content of the requirements.txt file.
+        include_raw (bool): Keep the original manifest entry on each Dependency's raw field.
     Returns:
         List[Dependency]: List of extracted dependencies.
     """
-    dependencies: List[Dependency] = []
-    for line in content.splitlines():
-        line = line.strip()
-        if not line or line.startswith('#'):
-            continue  # Skip empty lines and comments
-        match = re.match(r'([^=<>~!]+)([=<>~!]+)(.+)', line)
-        if match:
-            name = match.group(1).strip()
-            version = match.group(3).strip()
-            dependencies.append(Dependency(name=name, version=version, source='pypi', raw=line))
-        else:
-            dependencies.append(Dependency(name=line, source='pypi', raw=line))
-    return dependencies
+    # The line regex anchors on '\n', so fold CRLF and bare CR line endings first
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return [
+        Dependency(name=name or line, version=version or None, source='pypi', raw=line if include_raw else None)
+        for line, name, version in _REQ_LINE_RE.findall(content)
+    ]
 
-def extract_package_json_from_content(content: str) -> List[Dependency]:
+@_ContentMemo
+def extract_package_json_from_content(content: str, include_raw: bool = False) -> List[Dependency]:
     """
     Parse a package.json file content and extract dependencies as Dependency objects.
     Args:
         content (str): The content of the package.json file.
+        include_raw (bool): Keep the original manifest entry on each Dependency's raw field.
     Returns:
         List[Dependency]: List of extracted dependencies.
     """
     dependencies: List[Dependency] = []
-    data: Dict[str, Any] = json.loads(content)
+    data: Dict[str, Any] = orjson.loads(content)
     for section in ['dependencies', 'devDependencies']:
         for name, version in data.get(section, {}).items():
-            dependencies.append(Dependency(name=name, version=version, source='npm', raw=f'{name}: {version}'))
+            dependencies.append(Dependency(name=name, version=version, source='npm', raw=f'{name}: {version}' if include_raw else None))
     return dependencies
 
-def extract_pyproject_toml_from_content(content: str) -> List[Dependency]:
+@_ContentMemo
+def extract_pyproject_toml_from_content(content: str, include_raw: bool = False) -> List[Dependency]:
     """
     Parse a pyproject.toml file content and extract dependencies as Dependency objects.
     Args:
         content (str): The content of the pyproject.toml file.
+        include_raw (bool): Keep the original manifest entry on each Dependency's raw field.
     Returns:
         List[Dependency]: List of extracted dependencies.
     """
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:
+        import tomli as tomllib
     dependencies: List[Dependency] = []
-    data: Dict[str, Any] = toml.loads(content)
+    data: Dict[str, Any] = tomllib.loads(content)
     poetry_deps: Dict[str, Union[str, Dict[str, Any]]] = data.get('tool', {}).get('poetry', {}).get('dependencies', {})
     for name, version in poetry_deps.items():
         if name.lower() == 'python':
@@ -61,56 +103,60 @@ def extract_pyproject_toml_from_content(content: str) -> List[Dependency]:
             version_str = version.get('version')
         else:
             version_str = version
-        dependencies.append(Dependency(name=name, version=version_str, source='poetry', raw=f'{name}: {version_str}'))
+        dependencies.append(Dependency(name=name, version=version_str, source='poetry', raw=f'{name}: {version_str}' if include_raw else None))
     return dependencies
 
-def extract_environment_yml_from_content(content: str) -> List[Dependency]:
+@_ContentMemo
+def extract_environment_yml_from_content(content: str, include_raw: bool = False) -> List[Dependency]:
     """
     Parse an environment.yml file content and extract dependencies as Dependency objects.
     Args:
         content (str): The content of the environment.yml file.
+        include_raw (bool): Keep the original manifest entry on each Dependency's raw field.
     Returns:
         List[Dependency]: List of extracted dependencies.
     """
+    import yaml
+    # Prefer the libyaml-backed loader when PyYAML was built with it
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
     dependencies: List[Dependency] = []
-    data: Dict[str, Any] = yaml.safe_load(content)
+    data: Dict[str, Any] = yaml.load(content, Loader=loader)
     for dep in data.get('dependencies', []):
         if isinstance(dep, str):
             # Conda dependency
             name, *version = dep.split('=')
-            dependencies.append(Dependency(name=name.strip(), version='='.join(version) if version else None, source='conda', raw=dep))
+            dependencies.append(Dependency(name=name.strip(), version='='.join(version) if version else None, source='conda', raw=dep if include_raw else None))
         elif isinstance(dep, dict) and 'pip' in dep:
             # Pip dependencies inside environment.yml
             pip_deps: List[str] = dep['pip']
             for pip_dep in pip_deps:
                 name, *version = pip_dep.split('==')
-                dependencies.append(Dependency(name=name.strip(), version=version[0] if version else None, source='pip', raw=pip_dep))
+                dependencies.append(Dependency(name=name.strip(), version=version[0] if version else None, source='pip', raw=pip_dep if include_raw else None))
     return dependencies
 
-def extract_poetry_lock_from_content(content: str) -> List[Dependency]:
+@_ContentMemo
+def extract_poetry_lock_from_content(content: str, include_raw: bool = False) -> List[Dependency]:
     """
     Parse a poetry.lock file content and extract main dependencies as Dependency objects.
     Args:
         content (str): The content of the poetry.lock file.
+        include_raw (bool): Keep the original manifest entry on each Dependency's raw field.
     Returns:
         List[Dependency]: List of extracted dependencies.
     """
     dependencies: List[Dependency] = []
-    import re as _re
-    # Split the file into package blocks
-    packages: List[str] = _re.split(r'\n\[\[package\]\]\n', content)
-    for pkg in packages:
-        lines: List[str] = pkg.strip().splitlines()
-        name: Union[str, None] = None
-        version: Union[str, None] = None
-        category: Union[str, None] = None
-        for line in lines:
-            if line.startswith('name = '):
-                name = line.split('=', 1)[1].strip().strip('"')
-            elif line.startswith('version = '):
-                version = line.split('=', 1)[1].strip().strip('"')
-            elif line.startswith('category = '):
-                category = line.split('=', 1)[1].strip().strip('"')
-        if name and category == 'main':
-            dependencies.append(Dependency(name=name, version=version, source='poetry.lock', raw=pkg.strip()))
-    return dependencies
\ No newline at end of file
+    fields: Dict[str, str] = {}
+    block_start: int = 0
+    # One regex scan visits only the relevant lines; each [[package]] header closes the previous block
+    for match in _POETRY_LOCK_LINE_RE.finditer(content):
+        key = match.group(1)
+        if key is None:
+            if fields.get('name') and fields.get('category') == 'main':
+                dependencies.append(Dependency(name=fields['name'], version=fields.get('version'), source='poetry.lock', raw=content[block_start:match.start()].strip() if include_raw else None))
+            fields = {}
+            block_start = match.start()
+        else:
+            fields[key] = match.group(2).strip().strip('"')
+    if fields.get('name') and fields.get('category') == 'main':
+        dependencies.append(Dependency(name=fields['name'], version=fields.get('version'), source='poetry.lock', raw=content[block_start:].strip() if include_raw else None))
+    return dependencies
@@ -0,0 +1,28 @@
+import httpx
+from typing import Optional
+
+# Outbound connection pool and timeouts; keep-alive lets registry and forge calls reuse connections
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+HTTP_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+USER_AGENT = "vitalis/0.1.0"
+# Attempts to re-establish a connection that failed to connect before giving up
+CONNECT_RETRIES = 3
+
+def create_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Create the HTTP client shared by all PyPI, npm, GitHub, and GitLab requests.
+    HTTP/2 lets concurrent requests to the same host multiplex over one TLS connection.
+    Args:
+        transport (httpx.AsyncBaseTransport, optional): Transport to send requests through instead of the network.
+    Returns:
+        httpx.AsyncClient: The configured client; the caller is responsible for closing it.
+    """
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(http2=True, limits=HTTP_LIMITS, retries=CONNECT_RETRIES)
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=HTTP_TIMEOUT,
+        headers={"User-Agent": USER_AGENT},
+        # PyPI redirects non-canonical project names and GitHub redirects renamed repositories
+        follow_redirects=True,
+    )
@@ -0,0 +1,87 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Path of the persistent package index; the index is disabled when unset
+PACKAGE_INDEX_PATH = os.getenv('VITALIS_PACKAGE_INDEX')
+# How long an indexed package summary is trusted before PyPI is asked again
+PACKAGE_INDEX_TTL_SECONDS = 24 * 3600
+
+# Summary fields kept per package, in the key order of the analyzer's package summary
+INDEX_FIELDS = (
+    "summary",
+    "repository_url",
+    "repository_platform",
+    "repository_org",
+    "repository_name",
+    "latest_version",
+    "created_date",
+)
+
+_connection: Optional[sqlite3.Connection] = None
+# The connection is shared by the worker threads lookups and writes run on
+_lock = threading.Lock()
+
+def enabled() -> bool:
+    """
+    Check whether a package index path is configured.
+    Returns:
+        bool: True if lookups and writes go to an index file.
+    """
+    return bool(PACKAGE_INDEX_PATH)
+
+def _connect() -> Optional[sqlite3.Connection]:
+    """
+    Open the package index on first use, creating the file and table if needed.
+    Returns:
+        sqlite3.Connection or None: The index connection, or None if no index path is configured.
+    """
+    global _connection
+    if _connection is None and PACKAGE_INDEX_PATH:
+        path = os.path.expanduser(PACKAGE_INDEX_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        _connection = sqlite3.connect(path, check_same_thread=False)
+        columns = ", ".join(f"{field} TEXT" for field in INDEX_FIELDS)
+        _connection.execute(
+            f"CREATE TABLE IF NOT EXISTS packages (name TEXT PRIMARY KEY, {columns}, updated_at INTEGER NOT NULL)"
+        )
+    return _connection
+
+def lookup(name: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the indexed summary for a PyPI package if it is still fresh.
+    Args:
+        name (str): The canonical PyPI project name.
+    Returns:
+        dict or None: The package summary keyed by INDEX_FIELDS, or None on a miss or stale entry.
+    """
+    with _lock:
+        connection = _connect()
+        if connection is None:
+            return None
+        row = connection.execute(
+            f"SELECT {', '.join(INDEX_FIELDS)}, updated_at FROM packages WHERE name = ?", (name,)
+        ).fetchone()
+    if row is None or time.time() - row[-1] > PACKAGE_INDEX_TTL_SECONDS:
+        return None
+    return dict(zip(INDEX_FIELDS, row))
+
+def record(name: str, summary: Dict[str, Any]) -> None:
+    """
+    Store the summary for a PyPI package, replacing any previous entry.
+    Args:
+        name (str): The canonical PyPI project name.
+        summary (dict): The package summary keyed by INDEX_FIELDS.
+    """
+    placeholders = ", ".join("?" for _ in range(len(INDEX_FIELDS) + 2))
+    with _lock:
+        connection = _connect()
+        if connection is None:
+            return
+        with connection:
+            connection.execute(
+                f"INSERT OR REPLACE INTO packages (name, {', '.join(INDEX_FIELDS)}, updated_at) VALUES ({placeholders})",
+                (name, *(summary.get(field) for field in INDEX_FIELDS), int(time.time())),
+            )
@@ -1,50 +1,217 @@
 import re
-import requests
-from typing import Dict, Optional, Tuple, Any, List
+import time
+import asyncio
+import httpx
+import orjson
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Any, List
 from urllib.parse import urlparse
 
-def get_library_info(library_name: str) -> Optional[Dict[str, Any]]:
+# Default lifetime of cached registry metadata when the response carries no max-age
+METADATA_TTL_SECONDS = 3600
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+# Package names accepted for registry lookups
+_NAME_RE = re.compile(r"[a-zA-Z0-9_-]+\Z")
+# Separator runs collapsed by PEP 503 name normalization
+_PEP503_SEPARATORS_RE = re.compile(r"[-_.]+")
+# Registry metadata cache: (registry, name) -> (expires_at, etag, last_modified, metadata)
+# Expired entries are kept so they can be revalidated with a conditional GET.
+_metadata_cache: Dict[Tuple[str, str], Tuple[float, Optional[str], Optional[str], Dict[str, Any]]] = {}
+# Common https://host/org/repo(.git) repository URL shape, matched without urlparse
+_REPO_URL_RE = re.compile(
+    r"(?:git\+)?https?://(?:[\w.-]+\.)?(github\.com|gitlab\.com|bitbucket\.org)/([^/?#]+)/([^/?#]+?)(?:\.git)?(?:[/?#].*)?\Z"
+)
+_REPO_PLATFORMS: Dict[str, str] = {"github.com": "github", "gitlab.com": "gitlab", "bitbucket.org": "bitbucket"}
+# Preference for project URL labels when picking a repository (lower wins); excluded
+# labels are ranked past every other label so they are never chosen
+_OTHER_URL_PRIORITY = 2
+_PROJECT_URL_PRIORITIES: Dict[str, int] = {
+    "source": 0, "repository": 0, "code": 0,
+    "homepage": 1,
+    "funding": 3, "sponsor": 3, "donate": 3, "bug tracker": 3, "issue tracker": 3, "documentation": 3,
+}
+# Upper bound on cached packages; the least recently stored entry is evicted first
+METADATA_CACHE_MAXSIZE = 4096
+# Registry fetches in progress, so concurrent lookups of one package share a single request
+_inflight: Dict[Tuple[str, str], "asyncio.Future[Optional[Dict[str, Any]]]"] = {}
+
+def canonicalize_pypi_name(name: str) -> str:
+    """
+    Normalize a PyPI project name per PEP 503 so spelling variants share one lookup.
+    Args:
+        name (str): The project name as written in the manifest.
+    Returns:
+        str: The lowercased name with runs of '-', '_' and '.' collapsed to '-'.
+    """
+    return _PEP503_SEPARATORS_RE.sub("-", name).lower()
+
+def _response_ttl(response: httpx.Response) -> float:
+    """
+    Get the cache lifetime for a registry response, honoring Cache-Control max-age when present.
+    Args:
+        response (httpx.Response): The registry response.
+    Returns:
+        float: The number of seconds the response may be served from cache.
+    """
+    match = _MAX_AGE_RE.search(response.headers.get("Cache-Control", ""))
+    return int(match.group(1)) if match else METADATA_TTL_SECONDS
+
+def _cached_metadata(key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Return cached registry metadata for a key if it has not expired.
+    Args:
+        key (tuple): The (registry, name) cache key.
+    Returns:
+        dict or None: The cached metadata, or None on a miss or expired entry.
+    """
+    entry = _metadata_cache.get(key)
+    if entry is None or time.monotonic() >= entry[0]:
+        return None
+    return entry[3]
+
+def _revalidation_headers(key: Tuple[str, str]) -> Dict[str, str]:
+    """
+    Build conditional request headers from the validators of a cached entry.
+    Args:
+        key (tuple): The (registry, name) cache key.
+    Returns:
+        dict: If-None-Match/If-Modified-Since headers, empty if nothing is cached.
+    """
+    headers: Dict[str, str] = {}
+    entry = _metadata_cache.get(key)
+    if entry is not None:
+        _, etag, last_modified, _ = entry
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    return headers
+
+def _store_metadata(key: Tuple[str, str], data: Dict[str, Any], response: httpx.Response) -> None:
+    """
+    Cache registry metadata along with the response's validators.
+    Args:
+        key (tuple): The (registry, name) cache key.
+        data (dict): The decoded metadata to cache.
+        response (httpx.Response): The registry response the metadata came from.
+    """
+    _metadata_cache.pop(key, None)
+    if len(_metadata_cache) >= METADATA_CACHE_MAXSIZE:
+        del _metadata_cache[next(iter(_metadata_cache))]
+    _metadata_cache[key] = (
+        time.monotonic() + _response_ttl(response),
+        response.headers.get("ETag"),
+        response.headers.get("Last-Modified"),
+        data,
+    )
+
+def _refresh_metadata(key: Tuple[str, str], response: httpx.Response) -> Dict[str, Any]:
+    """
+    Extend the lifetime of a cached entry after a 304 Not Modified response.
+    Args:
+        key (tuple): The (registry, name) cache key.
+        response (httpx.Response): The 304 response from the registry.
+    Returns:
+        dict: The cached metadata, still current upstream.
+    """
+    _, etag, last_modified, data = _metadata_cache[key]
+    _metadata_cache[key] = (
+        time.monotonic() + _response_ttl(response),
+        response.headers.get("ETag", etag),
+        response.headers.get("Last-Modified", last_modified),
+        data,
+    )
+    return data
+
+async def _fetch_once(
+    key: Tuple[str, str],
+    fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Run a registry fetch, joining one already in progress for the same key.
+    Args:
+        key (tuple): The (registry, name) cache key.
+        fetch (callable): Starts the registry request when none is in flight.
+    Returns:
+        dict or None: The fetch result, shared by every concurrent caller.
+    """
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(fetch())
+        _inflight[key] = future
+        future.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shield so one cancelled caller doesn't abort the fetch for the others
+    return await asyncio.shield(future)
+
+async def get_library_info(client: httpx.AsyncClient, library_name: str) -> Optional[Dict[str, Any]]:
     """
     Fetch package metadata from PyPI for a given library name.
     Args:
+        client (httpx.AsyncClient): Shared HTTP client used for the request.
         library_name (str): The name of the library to fetch.
     Returns:
         dict or None: The package metadata as a dictionary, or None if not found or error.
     Raises:
         ValueError: If the library name is invalid.
     """
-    if not re.match(r"^[a-zA-Z0-9_-]+$", library_name):
+    if not _NAME_RE.match(library_name):
         raise ValueError("Invalid library name. Only alphanumeric characters, dashes, and underscores are allowed.")
+    key: Tuple[str, str] = ("pypi", library_name.lower())
+    cached = _cached_metadata(key)
+    if cached is not None:
+        return cached
     url: str = f"https://pypi.org/pypi/{library_name}/json"
-    try:
-        response: requests.Response = requests.get(url)
-        response.raise_for_status()
-        json_data: Dict[str, Any] = response.json()
+
+    async def fetch() -> Optional[Dict[str, Any]]:
+        try:
+            # Revalidate a stale entry so an unchanged project costs a 304 instead of the full JSON
+            response: httpx.Response = await client.get(url, headers=_revalidation_headers(key))
+            if response.status_code == 304:
+                return _refresh_metadata(key, response)
+            response.raise_for_status()
+            json_data: Dict[str, Any] = orjson.loads(response.content)
+        except httpx.HTTPError:
+            return None
+        _store_metadata(key, json_data, response)
         return json_data
-    except requests.exceptions.RequestException:
-        return None
 
-def get_npm_info(package_name: str) -> Optional[Dict[str, Any]]:
+    return await _fetch_once(key, fetch)
+
+async def get_npm_info(client: httpx.AsyncClient, package_name: str) -> Optional[Dict[str, Any]]:
     """
     Fetch package metadata from npm registry for a given package name.
     Args:
+        client (httpx.AsyncClient): Shared HTTP client used for the request.
         package_name (str): The name of the npm package.
     Returns:
         dict or None: The package metadata as a dictionary, or None if not found or error.
     Raises:
         ValueError: If the package name is invalid.
     """
-    if not re.match(r"^[a-zA-Z0-9_-]+$", package_name):
+    if not _NAME_RE.match(package_name):
         raise ValueError("Invalid package name. Only alphanumeric characters, dashes, and underscores are allowed.")
+    key: Tuple[str, str] = ("npm", package_name)
+    cached = _cached_metadata(key)
+    if cached is not None:
+        return cached
     url: str = f"https://registry.npmjs.org/{package_name}"
-    try:
-        response: requests.Response = requests.get(url)
-        response.raise_for_status()
-        json_data: Dict[str, Any] = response.json()
+
+    async def fetch() -> Optional[Dict[str, Any]]:
+        try:
+            # Revalidate a stale entry so an unchanged packument costs a 304 instead of the full document
+            response: httpx.Response = await client.get(url, headers=_revalidation_headers(key))
+            if response.status_code == 304:
+                return _refresh_metadata(key, response)
+            response.raise_for_status()
+            json_data: Dict[str, Any] = orjson.loads(response.content)
+        except httpx.HTTPError:
+            return None
+        _store_metadata(key, json_data, response)
         return json_data
-    except requests.exceptions.RequestException:
-        return None
 
+    return await _fetch_once(key, fetch)
+
+@lru_cache(maxsize=4096)
 def parse_repo_url(url: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
     Parse a repository URL and extract the platform, organization, and repository name.
@@ -52,7 +219,15 @@ def parse_repo_url(url: str) -> Tuple[Optional[str], Optional[str], Optional[str
         url (str): The repository URL.
     Returns:
         tuple: (platform, org, repo) or (None, None, None) if not recognized.
+        Results are memoized, since the same URLs recur across dependencies.
     """
+    # Most project URLs (docs, homepages, funding) name no supported forge; reject them before any parsing
+    if not any(host in url for host in _REPO_PLATFORMS):
+        return None, None, None
+    match = _REPO_URL_RE.match(url)
+    if match:
+        return _REPO_PLATFORMS[match.group(1)], match.group(2), match.group(3)
+    # Slow path for anything else, e.g. other schemes or explicit ports
     if url.startswith('git+'):
         url = url[4:]
     parsed_url = urlparse(url)
@@ -77,30 +252,21 @@ def extract_repo_info(info: Dict[str, Any]) -> Tuple[Optional[str], Optional[str
     Returns:
         tuple: (repo_url, platform, org, repo) or (None, None, None, None) if not found.
     """
-    if not info or "project_urls" not in info:
+    if not info or not info.get("project_urls"):
         return None, None, None, None
-    primary_repo_types = ["Source", "Repository", "Code"]
-    secondary_repo_types = ["Homepage"]
-    # Prefer primary repo types
-    for url_type, url in info["project_urls"].items():
-        if url_type in primary_repo_types:
-            platform, org, repo = parse_repo_url(url)
-            if platform:
-                return url, platform, org, repo
-    # Fallback to secondary repo types
-    for url_type, url in info["project_urls"].items():
-        if url_type in secondary_repo_types:
-            platform, org, repo = parse_repo_url(url)
-            if platform:
-                return url, platform, org, repo
-    # Fallback to any other URL except excluded types
-    excluded_types = ["Funding", "Sponsor", "Donate", "Bug Tracker", "Issue Tracker", "Documentation"]
+    best: Tuple[Optional[str], Optional[str], Optional[str], Optional[str]] = (None, None, None, None)
+    best_priority = _OTHER_URL_PRIORITY + 1
+    # Single pass over the URLs, keeping the first parseable one of the best priority seen
     for url_type, url in info["project_urls"].items():
-        if url_type not in excluded_types:
-            platform, org, repo = parse_repo_url(url)
-            if platform:
-                return url, platform, org, repo
-    return None, None, None, None
+        priority = _PROJECT_URL_PRIORITIES.get(url_type.lower(), _OTHER_URL_PRIORITY)
+        if priority >= best_priority:
+            continue
+        platform, org, repo = parse_repo_url(url)
+        if platform:
+            best, best_priority = (url, platform, org, repo), priority
+            if priority == 0:
+                break
+    return best
 
 def extract_npm_repo_info(info: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
     """
@@ -126,13 +292,8 @@ def get_latest_version_release_date(info: Dict[str, Any]) -> Optional[str]:
     Returns:
         str or None: The ISO 8601 release date string, or None if not found.
     """
-    if not info or "releases" not in info:
+    if not info:
         return None
     latest_version = info.get("info", {}).get("version")
-    if not latest_version or latest_version not in info["releases"]:
-        return None
-    releases = info["releases"][latest_version]
-    if not releases:
-        return None
-    upload_time: Optional[str] = releases[0].get("upload_time_iso_8601")
-    return upload_time
\ No newline at end of file
+    files = info.get("releases", {}).get(latest_version) if latest_version else None
+    return files[0].get("upload_time_iso_8601") if files else None
\ No newline at end of file
@@ -1,7 +1,9 @@
 import os
-import requests
+import time
+import asyncio
+import httpx
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from urllib.parse import quote
 from dotenv import load_dotenv
 from ..models.schemas import HealthCheckResult, Policy
@@ -23,11 +25,162 @@ LICENSE_FILES = [
     "LICENSE", "LICENSE.md", "LICENSE.txt", "LICENSE.markdown", "LICENSE.mdown", "LICENSE.mkdn",
     "COPYING", "COPYING.md", "COPYING.txt", "COPYING.markdown", "COPYING.mdown", "COPYING.mkdn"
 ]
+# Lowercased lookups for matching directory listings against the names above
+_README_NAMES = frozenset(name.lower() for name in README_FILES)
+_LICENSE_NAMES = frozenset(name.lower() for name in LICENSE_FILES)
 
-def check_github_health(owner: str, repo: str, policy: Policy, token: Optional[str] = None) -> HealthCheckResult:
+# GitHub rate-limit budget as last reported by the API, shared by all concurrent checks
+_rl_state: Dict[str, float] = {"remaining": 5000, "reset": 0, "retry_at": 0}
+# Remaining-call threshold below which GitHub checks are skipped until the window resets
+RATE_LIMIT_FLOOR = 10
+# Longest Retry-After we are willing to wait out before giving up on a request
+MAX_RETRY_AFTER_SECONDS = 60
+
+# Last successful GitHub response per URL, revalidated with If-None-Match (304s are free of quota)
+_etag_cache: Dict[str, Tuple[str, httpx.Response]] = {}
+# Upper bound on URLs kept for revalidation; the oldest entry is evicted first
+ETAG_CACHE_MAXSIZE = 2048
+
+# How long a completed health check is reused for the same repository and policy
+HEALTH_CACHE_TTL_SECONDS = 600
+# Health check memo: (platform, owner, repo, policy) -> (expires_at, result)
+_health_cache: Dict[Tuple[str, str, str, str], Tuple[float, HealthCheckResult]] = {}
+# Upper bound on memoized health checks; the oldest entry is evicted first
+HEALTH_CACHE_MAXSIZE = 2048
+
+def _github_rate_limited() -> bool:
+    """
+    Check whether the GitHub rate-limit budget is exhausted for the current window.
+    Returns:
+        bool: True if calls should be skipped until the window resets.
+    """
+    return _rl_state["remaining"] < RATE_LIMIT_FLOOR and time.time() < _rl_state["reset"]
+
+def _update_github_rate_limit(response: httpx.Response) -> None:
+    """
+    Record the rate-limit headers of a GitHub API response.
+    Args:
+        response (httpx.Response): The GitHub API response.
+    """
+    remaining = response.headers.get("x-ratelimit-remaining")
+    reset = response.headers.get("x-ratelimit-reset")
+    if remaining is not None:
+        _rl_state["remaining"] = int(remaining)
+    if reset is not None:
+        _rl_state["reset"] = int(reset)
+
+async def _github_get(client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> httpx.Response:
+    """
+    GET a GitHub API URL, honoring any shared backoff and retrying once after a Retry-After.
+    A previously seen URL is revalidated with its ETag, and the earlier response is
+    returned when GitHub answers 304 Not Modified.
+    Args:
+        client (httpx.AsyncClient): Shared HTTP client used for the request.
+        url (str): The API URL to fetch.
+        headers (dict): Request headers.
+    Returns:
+        httpx.Response: The API response.
+    """
+    # Wait out a backoff requested by GitHub on any concurrent check
+    delay = _rl_state["retry_at"] - time.time()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    cached = _etag_cache.get(url)
+    if cached is not None:
+        headers = {**headers, "If-None-Match": cached[0]}
+    response: httpx.Response = await client.get(url, headers=headers)
+    _update_github_rate_limit(response)
+    if response.status_code in (403, 429):
+        retry_after = response.headers.get("retry-after", "")
+        if retry_after.isdigit() and int(retry_after) <= MAX_RETRY_AFTER_SECONDS:
+            _rl_state["retry_at"] = max(_rl_state["retry_at"], time.time() + int(retry_after))
+            await asyncio.sleep(int(retry_after))
+            response = await client.get(url, headers=headers)
+            _update_github_rate_limit(response)
+    if response.status_code == 304 and cached is not None:
+        return cached[1]
+    etag = response.headers.get("etag")
+    if response.status_code == 200 and etag:
+        _etag_cache.pop(url, None)
+        if len(_etag_cache) >= ETAG_CACHE_MAXSIZE:
+            del _etag_cache[next(iter(_etag_cache))]
+        _etag_cache[url] = (etag, response)
+    return response
+
+def _apply_activity_policy(result: HealthCheckResult, last_activity_at: Optional[str], policy: Policy) -> None:
+    """
+    Record a repository's last activity and flag it if it has gone quiet.
+    Args:
+        result (HealthCheckResult): The result being built; updated in place.
+        last_activity_at (Optional[str]): ISO 8601 timestamp of the last activity, if known.
+        policy (Policy): Health policy to enforce.
+    """
+    result.last_activity = last_activity_at
+    if not last_activity_at:
+        return
+    # Calculate days since last activity
+    last_activity = parse_iso8601_timestamp(last_activity_at)
+    now = datetime.now(timezone.utc)
+    result.days_since_last_activity = (now - last_activity).days
+    if result.days_since_last_activity > policy.max_inactive_days:
+        result.warnings.append(f"Repository has been inactive for over {policy.max_inactive_days} days")
+        result.is_healthy = False
+    elif result.days_since_last_activity > 90:
+        result.warnings.append("Repository has been inactive for over 90 days")
+
+def _apply_root_files_policy(result: HealthCheckResult, entries: List[Dict[str, Any]], policy: Policy) -> None:
+    """
+    Detect README and LICENSE files in a repository root listing and enforce the policy.
+    Args:
+        result (HealthCheckResult): The result being built; updated in place.
+        entries (list): Root directory entries, each with a 'name' key.
+        policy (Policy): Health policy to enforce.
+    """
+    result.has_readme = any(entry["name"].lower() in _README_NAMES for entry in entries)
+    result.has_license = any(entry["name"].lower() in _LICENSE_NAMES for entry in entries)
+    if policy.require_readme and not result.has_readme:
+        result.warnings.append("No README file found")
+        result.is_healthy = False
+    if policy.require_license and not result.has_license:
+        result.warnings.append("No LICENSE file found")
+        result.is_healthy = False
+
+async def _probe_gitlab_files(
+    client: httpx.AsyncClient,
+    project_url: str,
+    ref: str,
+    headers: Dict[str, str],
+    entries: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Check for README and LICENSE files not found in a partial root listing using HEAD requests.
+    Args:
+        client (httpx.AsyncClient): Shared HTTP client used for API requests.
+        project_url (str): GitLab API URL of the project.
+        ref (str): Branch to look for the files on.
+        headers (dict): Request headers.
+        entries (list): Root directory entries already known.
+    Returns:
+        list: Entries, each with a 'name' key, for the probed files that exist.
+    """
+    names = {entry["name"].lower() for entry in entries}
+    candidates: List[str] = []
+    if not names & _README_NAMES:
+        candidates.extend(README_FILES)
+    if not names & _LICENSE_NAMES:
+        candidates.extend(LICENSE_FILES)
+    # HEAD only returns the file's metadata headers, not its base64-encoded content
+    responses = await asyncio.gather(*(
+        client.head(f"{project_url}/repository/files/{quote(name, safe='')}", headers=headers, params={"ref": ref})
+        for name in candidates
+    ))
+    return [{"name": name} for name, response in zip(candidates, responses) if response.status_code in (200, 204)]
+
+async def check_github_health(client: httpx.AsyncClient, owner: str, repo: str, policy: Policy, token: Optional[str] = None) -> HealthCheckResult:
     """
     Check the health of a GitHub repository based on activity, issues, stars, forks, and presence of README/LICENSE.
     Args:
+        client (httpx.AsyncClient): Shared HTTP client used for API requests.
         owner (str): GitHub organization or user.
         repo (str): Repository name.
         policy (Policy): Health policy to enforce.
@@ -45,54 +198,40 @@ def check_github_health(owner: str, repo: str, policy: Policy, token: Optional[s
         owner=owner,
         repo_name=repo
     )
+    if _github_rate_limited():
+        # Skip calls that would only come back 403 until the window resets
+        result.errors.append("github rate-limited")
+        result.is_healthy = False
+        return result
     try:
-        # Fetch repository metadata
+        # Fetch repository metadata and root contents concurrently
         repo_url: str = f"{GITHUB_API_BASE}/repos/{owner}/{repo}"
-        repo_response: requests.Response = requests.get(repo_url, headers=headers)
+        contents_url: str = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents"
+        repo_response, contents_response = await asyncio.gather(
+            _github_get(client, repo_url, headers),
+            _github_get(client, contents_url, headers)
+        )
         repo_response.raise_for_status()
         repo_data: Dict[str, Any] = repo_response.json()
-        result.last_activity = repo_data.get("pushed_at")
-        if result.last_activity:
-            # Calculate days since last activity
-            last_activity = parse_iso8601_timestamp(result.last_activity)
-            now = datetime.now(timezone.utc)
-            result.days_since_last_activity = (now - last_activity).days
-            if result.days_since_last_activity > policy.max_inactive_days:
-                result.warnings.append(f"Repository has been inactive for over {policy.max_inactive_days} days")
-                result.is_healthy = False
-            elif result.days_since_last_activity > 90:
-                result.warnings.append("Repository has been inactive for over 90 days")
-        # Fetch open issues
-        issues_url: str = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues"
-        issues_response: requests.Response = requests.get(issues_url, headers=headers)
-        issues_response.raise_for_status()
-        result.open_issues_count = len(issues_response.json())
-        # Fetch stars and forks count
+        _apply_activity_policy(result, repo_data.get("pushed_at"), policy)
+        # Open issue, star, and fork counts all come with the repository metadata
+        result.open_issues_count = repo_data.get("open_issues_count", 0)
         result.stars_count = repo_data.get("stargazers_count", 0)
         result.forks_count = repo_data.get("forks_count", 0)
         # Check for README and LICENSE files in repo root
-        contents_url: str = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents"
-        contents_response: requests.Response = requests.get(contents_url, headers=headers)
         if contents_response.status_code == 200:
-            contents: List[Dict[str, Any]] = contents_response.json()
-            result.has_readme = any(file["name"].lower() in [r.lower() for r in README_FILES] for file in contents)
-            result.has_license = any(file["name"].lower() in [l.lower() for l in LICENSE_FILES] for file in contents)
-            if policy.require_readme and not result.has_readme:
-                result.warnings.append("No README file found")
-                result.is_healthy = False
-            if policy.require_license and not result.has_license:
-                result.warnings.append("No LICENSE file found")
-                result.is_healthy = False
-    except requests.exceptions.RequestException as e:
+            _apply_root_files_policy(result, contents_response.json(), policy)
+    except httpx.HTTPError as e:
         # Handle network or API errors
         result.errors.append(f"Error checking GitHub repository: {str(e)}")
         result.is_healthy = False
     return result
 
-def check_gitlab_health(owner: str, repo: str, policy: Policy, token: Optional[str] = None) -> HealthCheckResult:
+async def check_gitlab_health(client: httpx.AsyncClient, owner: str, repo: str, policy: Policy, token: Optional[str] = None) -> HealthCheckResult:
     """
     Check the health of a GitLab repository based on activity, issues, stars, forks, and presence of README/LICENSE.
     Args:
+        client (httpx.AsyncClient): Shared HTTP client used for API requests.
         owner (str): GitLab group or user.
         repo (str): Repository name.
         policy (Policy): Health policy to enforce.
@@ -111,58 +250,63 @@ def check_gitlab_health(owner: str, repo: str, policy: Policy, token: Optional[s
         repo_name=repo
     )
     try:
-        # Fetch project metadata
+        # Fetch project metadata, open issues, and the root of the default branch concurrently
         project_url: str = f"{GITLAB_API_BASE}/projects/{owner}%2F{repo}"
-        project_response: requests.Response = requests.get(project_url, headers=headers)
+        issues_url: str = f"{GITLAB_API_BASE}/projects/{owner}%2F{repo}/issues"
+        tree_url: str = f"{GITLAB_API_BASE}/projects/{owner}%2F{repo}/repository/tree"
+        project_response, issues_response, tree_response = await asyncio.gather(
+            client.get(project_url, headers=headers),
+            client.get(issues_url, headers=headers),
+            client.get(tree_url, headers=headers, params={"per_page": 100})
+        )
         project_response.raise_for_status()
         project_data: Dict[str, Any] = project_response.json()
-        result.last_activity = project_data.get("last_activity_at")
-        if result.last_activity:
-            # Calculate days since last activity
-            last_activity = parse_iso8601_timestamp(result.last_activity)
-            now = datetime.now(timezone.utc)
-            result.days_since_last_activity = (now - last_activity).days
-            if result.days_since_last_activity > policy.max_inactive_days:
-                result.warnings.append(f"Repository has been inactive for over {policy.max_inactive_days} days")
-                result.is_healthy = False
-            elif result.days_since_last_activity > 90:
-                result.warnings.append("Repository has been inactive for over 90 days")
-        # Fetch open issues
-        issues_url: str = f"{GITLAB_API_BASE}/projects/{owner}%2F{repo}/issues"
-        issues_response: requests.Response = requests.get(issues_url, headers=headers)
+        _apply_activity_policy(result, project_data.get("last_activity_at"), policy)
+        # Count open issues
         issues_response.raise_for_status()
         result.open_issues_count = len(issues_response.json())
         # Fetch stars and forks count
         result.stars_count = project_data.get("star_count", 0)
         result.forks_count = project_data.get("forks_count", 0)
-        # Determine default branch for file checks
-        default_branch: str = project_data.get("default_branch", "master")
-        # Check for README files
-        result.has_readme = False
-        for readme_name in README_FILES:
-            file_url: str = f"{GITLAB_API_BASE}/projects/{owner}%2F{repo}/repository/files/{quote(readme_name, safe='')}"
-            params: Dict[str, str] = {"ref": default_branch}
-            file_response: requests.Response = requests.get(file_url, headers=headers, params=params)
-            if file_response.status_code == 200:
-                result.has_readme = True
-                break
-        if policy.require_readme and not result.has_readme:
-            result.warnings.append("No README file found")
-            result.is_healthy = False
-        # Check for LICENSE files
-        result.has_license = False
-        for license_name in LICENSE_FILES:
-            license_file_url: str = f"{GITLAB_API_BASE}/projects/{owner}%2F{repo}/repository/files/{quote(license_name, safe='')}"
-            license_params: Dict[str, str] = {"ref": default_branch}
-            license_file_response: requests.Response = requests.get(license_file_url, headers=headers, params=license_params)
-            if license_file_response.status_code == 200:
-                result.has_license = True
-                break
-        if policy.require_license and not result.has_license:
-            result.warnings.append("No LICENSE file found")
-            result.is_healthy = False
-    except requests.exceptions.RequestException as e:
+        # Match README/LICENSE names against the root listing
+        tree: List[Dict[str, Any]] = tree_response.json() if tree_response.status_code == 200 else []
+        if tree_response.status_code != 200 or tree_response.headers.get("x-next-page"):
+            # The listing failed or was truncated, so probe for the files it may have missed
+            default_branch: str = project_data.get("default_branch", "master")
+            tree = tree + await _probe_gitlab_files(client, project_url, default_branch, headers, tree)
+        _apply_root_files_policy(result, tree, policy)
+    except httpx.HTTPError as e:
         # Handle network or API errors
         result.errors.append(f"Error checking GitLab repository: {str(e)}")
         result.is_healthy = False
-    return result
\ No newline at end of file
+    return result
+
+async def check_health(client: httpx.AsyncClient, platform: str, owner: str, repo: str, policy: Policy) -> HealthCheckResult:
+    """
+    Check the health of a GitHub or GitLab repository, reusing a recent result for the same repository and policy.
+    Args:
+        client (httpx.AsyncClient): Shared HTTP client used for API requests.
+        platform (str): Hosting platform, either 'github' or 'gitlab'.
+        owner (str): Organization, group, or user that owns the repository.
+        repo (str): Repository name.
+        policy (Policy): Health policy to enforce.
+    Returns:
+        HealthCheckResult: The health check result for the repository.
+    """
+    key = (platform, owner, repo, policy.model_dump_json())
+    entry = _health_cache.get(key)
+    if entry is not None:
+        if time.monotonic() < entry[0]:
+            return entry[1]
+        _health_cache.pop(key, None)
+    if platform == "github":
+        result = await check_github_health(client, owner, repo, policy, token=GITHUB_TOKEN)
+    else:
+        result = await check_gitlab_health(client, owner, repo, policy, token=GITLAB_TOKEN)
+    # Only memoize complete results so transient API errors are retried on the next request
+    if not result.errors:
+        _health_cache.pop(key, None)
+        if len(_health_cache) >= HEALTH_CACHE_MAXSIZE:
+            del _health_cache[next(iter(_health_cache))]
+        _health_cache[key] = (time.monotonic() + HEALTH_CACHE_TTL_SECONDS, result)
+    return result
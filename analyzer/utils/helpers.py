@@ -11,14 +11,19 @@ def parse_iso8601_timestamp(timestamp: str) -> datetime:
     Raises:
         ValueError: If the timestamp format is invalid.
     """
+    # fromisoformat only understands a trailing 'Z' from Python 3.11, so spell out the offset
+    normalized = timestamp[:-1] + "+00:00" if timestamp.endswith("Z") else timestamp
     try:
-        # Try parsing with milliseconds
-        dt = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%fZ")
+        dt = datetime.fromisoformat(normalized)
     except ValueError:
-        try:
-            # Try parsing without milliseconds
-            dt = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ")
-        except ValueError:
-            # Raise error if format is invalid
-            raise ValueError(f"Invalid ISO 8601 timestamp format: {timestamp}")
-    return dt.replace(tzinfo=timezone.utc)
\ No newline at end of file
+        # Before Python 3.11 fromisoformat only takes 3 or 6 fractional digits; strptime's %f takes 1-6
+        for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"):
+            try:
+                return datetime.strptime(timestamp, fmt).replace(tzinfo=timezone.utc)
+            except ValueError:
+                pass
+        # Raise error if format is invalid
+        raise ValueError(f"Invalid ISO 8601 timestamp format: {timestamp}")
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
@@ -1,7 +1,11 @@
+import sys
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, Optional
 
-@dataclass
+# __slots__ generation for dataclasses is only available on Python 3.10+
+_DATACLASS_OPTIONS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
 class Dependency:
     """
     Represents a single dependency parsed from a manifest file.
@@ -9,4 +13,4 @@ class Dependency:
     name: str                        # Name of the dependency
     version: Optional[str] = None    # Version specifier (if any)
     source: Optional[str] = None     # Source type (e.g., 'pypi', 'npm', 'conda', etc.)
-    raw: Optional[str] = None        # The raw line or entry from the manifest
\ No newline at end of file
+    raw: Optional[str] = None        # The raw line or entry from the manifest
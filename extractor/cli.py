@@ -1,13 +1,13 @@
+import importlib
+import os
+import sys
 import typer
-import json
+import orjson
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from extractor.extractor.requirements_txt import extract_requirements_txt
-from extractor.extractor.environment_yml import extract_environment_yml
-from extractor.extractor.pyproject_toml import extract_pyproject_toml
-from extractor.extractor.package_json import extract_package_json
-from extractor.extractor.poetry_lock import extract_poetry_lock
-from core.models import Dependency
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from extractor.utils import file_digest
 
 app = typer.Typer(help="Vitalis - Dependency manifest extractor and analyzer")
 
@@ -17,80 +17,188 @@ def _print_fallback_human_readable(deps_data: List[Dict[str, Any]]) -> None:
     Args:
         deps_data: List of dependency dictionaries to display.
     """
-    typer.echo("Basic Dependency Extraction")
-    typer.echo("=" * 40)
-    typer.echo(f"\nFound {len(deps_data)} dependencies:")
+    lines = ["Basic Dependency Extraction", "=" * 40, f"\nFound {len(deps_data)} dependencies:"]
+    lines.extend(f"• {dep.get('name', 'Unknown')} ({dep.get('version', 'Unknown')})" for dep in deps_data)
+    lines.append("\n   Note: Full analysis unavailable (analyzer service offline)")
+    # One echo call for the whole report; per-line echoes dominate on large lockfiles
+    typer.echo("\n".join(lines))
 
-    for dep in deps_data:
-        name = dep.get("name", "Unknown")
-        version = dep.get("version", "Unknown")
-        typer.echo(f"• {name} ({version})")
+# Manifest types and the "module:function" extractor for each one; extractor modules
+# are imported only once a manifest of that type is processed, keeping startup light
+_MANIFEST_EXTRACTORS: Dict[str, str] = {
+    'requirements.txt': 'extractor.extractor.requirements_txt:extract_requirements_txt',
+    'environment.yml': 'extractor.extractor.environment_yml:extract_environment_yml',
+    'pyproject.toml': 'extractor.extractor.pyproject_toml:extract_pyproject_toml',
+    'package.json': 'extractor.extractor.package_json:extract_package_json',
+    'poetry.lock': 'extractor.extractor.poetry_lock:extract_poetry_lock',
+}
 
-    typer.echo(f"\n   Note: Full analysis unavailable (analyzer service offline)")
+# Bump when extractor output changes so stale cached results are ignored
+_CACHE_VERSION = 1
+
+# Below both thresholds several manifests are parsed inline: starting worker
+# processes costs more than parsing a handful of small files
+_PARALLEL_MIN_FILES = 8
+_PARALLEL_MIN_BYTES = 1024 * 1024
+
+def _resolve_manifest_type(file: Path, manifest_type: Optional[str]) -> str:
+    """Validate a manifest file and determine its type.
+
+    Args:
+        file: Path to the manifest file.
+        manifest_type: Explicit manifest type, or None to infer it from the filename.
+
+    Returns:
+        The manifest type to extract the file with.
+
+    Raises:
+        typer.Exit: If the file doesn't exist, the manifest type cannot be inferred,
+                   or an unsupported manifest type is specified.
+    """
+    if not file.exists():
+        typer.echo(f"File not found: {file}", err=True)
+        raise typer.Exit(1)
+
+    # Infer manifest type from file name if not provided
+    if not manifest_type:
+        manifest_type = file.name.lower()
+        if manifest_type not in _MANIFEST_EXTRACTORS:
+            typer.echo("Could not infer manifest type. Please specify --manifest-type.", err=True)
+            raise typer.Exit(1)
+
+    if manifest_type not in _MANIFEST_EXTRACTORS:
+        typer.echo(f"Unsupported manifest type: {manifest_type}", err=True)
+        raise typer.Exit(1)
+    return manifest_type
+
+def _extract_one(file: Path, manifest_type: str, include_raw: bool = True) -> List[Dict[str, Any]]:
+    """Extract the dependencies of one manifest file as plain dictionaries.
+
+    Module-level so it can be sent to worker processes. When VITALIS_CACHE_DIR is
+    set, results are cached there keyed by a hash of the file's contents, so an
+    unchanged manifest is not parsed again on later runs.
+
+    Args:
+        file: Path to the manifest file.
+        manifest_type: Type of the manifest file.
+        include_raw: Keep the original manifest entry in each dependency's raw field.
+
+    Returns:
+        List of dependency dictionaries.
+    """
+    cache_dir = os.getenv('VITALIS_CACHE_DIR')
+    cache_file: Optional[Path] = None
+    if cache_dir:
+        cache_file = Path(cache_dir).expanduser() / f"v{_CACHE_VERSION}-{manifest_type}-{'raw' if include_raw else 'noraw'}-{file_digest(file)}.json"
+        if cache_file.exists():
+            return orjson.loads(cache_file.read_bytes())
+
+    module_name, function_name = _MANIFEST_EXTRACTORS[manifest_type].split(':')
+    extractor = getattr(importlib.import_module(module_name), function_name)
+    deps_data = [asdict(dep) for dep in extractor(str(file), include_raw)]
+
+    if cache_file is not None:
+        # Write to a temporary name first so concurrent runs never read a partial entry
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        temp_file.write_bytes(orjson.dumps(deps_data))
+        os.replace(temp_file, cache_file)
+    return deps_data
+
+def _extract_many(files: List[Path], manifest_types: List[str], include_raw: bool) -> Iterator[Tuple[Path, List[Dict[str, Any]]]]:
+    """Extract several manifest files, yielding each file's dependencies as it finishes.
+
+    Many or large files are parsed in parallel worker processes, in completion order;
+    otherwise they are parsed inline, in argument order.
+
+    Args:
+        files: Paths to the manifest files.
+        manifest_types: Type of each manifest file.
+        include_raw: Keep the original manifest entry in each dependency's raw field.
+
+    Yields:
+        Tuples of (file, list of dependency dictionaries).
+    """
+    if len(files) < _PARALLEL_MIN_FILES and sum(file.stat().st_size for file in files) < _PARALLEL_MIN_BYTES:
+        for file, file_type in zip(files, manifest_types):
+            yield file, _extract_one(file, file_type, include_raw)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1)) as executor:
+        futures = {
+            executor.submit(_extract_one, file, file_type, include_raw): file
+            for file, file_type in zip(files, manifest_types)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def _write_json(data: Any, option: int = 0) -> None:
+    """Write a value as a line of JSON straight to stdout as bytes.
+
+    Skips building an intermediate str, which matters for large manifests.
+
+    Args:
+        data: The value to serialize.
+        option: Additional orjson options, e.g. orjson.OPT_INDENT_2.
+    """
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(data, option=option | orjson.OPT_APPEND_NEWLINE))
+    sys.stdout.buffer.flush()
 
 @app.command()
 def extract(
-    file: Path = typer.Argument(..., help="Path to the manifest file"),
-    manifest_type: Optional[str] = typer.Option(None, help="Type of manifest: requirements.txt, environment.yml, pyproject.toml, package.json, poetry.lock"),
-    format: str = typer.Option("human", "--format", help="Output format: human or json (default: human)")
+    files: List[Path] = typer.Argument(..., help="Path to one or more manifest files"),
+    manifest_type: Optional[str] = typer.Option(None, help=f"Type of manifest: {', '.join(_MANIFEST_EXTRACTORS)}"),
+    format: str = typer.Option("human", "--format", help="Output format: human or json (default: human); ndjson writes one dependency per line"),
+    raw: bool = typer.Option(True, "--raw/--no-raw", help="Include each dependency's original manifest entry in the output")
 ) -> None:
-    """Extract dependencies from a manifest file.
+    """Extract dependencies from one or more manifest files.
     
     This command parses various manifest file formats and extracts dependency
     information. If manifest_type is not specified, it will be inferred from
-    the filename.
+    each filename. Many or large files are parsed in parallel worker processes.
+    With several files, json format writes one object mapping each path to its
+    dependencies; human and ndjson output report each file as it finishes.
     
     Args:
-        file: Path to the manifest file to process.
+        files: Paths to the manifest files to process.
         manifest_type: Type of manifest file. If None, will be inferred from filename.
-        format: Output format - either 'human' for readable output or 'json' for structured data.
+        format: Output format - 'human' for readable output, 'json' for structured data, or
+            'ndjson' for one dependency object per line.
+        raw: Whether to keep each dependency's original manifest entry; skipping it
+            saves building a string per dependency.
         
     Raises:
-        typer.Exit: If file doesn't exist, manifest type cannot be inferred, or
+        typer.Exit: If a file doesn't exist, a manifest type cannot be inferred, or
                    an unsupported manifest type is specified.
     """
-    if not file.exists():
-        typer.echo(f"File not found: {file}", err=True)
-        raise typer.Exit(1)
+    manifest_types = [_resolve_manifest_type(file, manifest_type) for file in files]
 
-    # Infer manifest type from file name if not provided
-    if not manifest_type:
-        name = file.name.lower()
-        if name == 'requirements.txt':
-            manifest_type = 'requirements.txt'
-        elif name == 'environment.yml':
-            manifest_type = 'environment.yml'
-        elif name == 'pyproject.toml':
-            manifest_type = 'pyproject.toml'
-        elif name == 'package.json':
-            manifest_type = 'package.json'
-        elif name == 'poetry.lock':
-            manifest_type = 'poetry.lock'
+    if len(files) == 1:
+        # Format output
+        deps_data = _extract_one(files[0], manifest_types[0], raw)
+        if format == "json":
+            _write_json(deps_data, orjson.OPT_INDENT_2)
+        elif format == "ndjson":
+            for dep in deps_data:
+                _write_json(dep)
         else:
-            typer.echo("Could not infer manifest type. Please specify --manifest-type.", err=True)
-            raise typer.Exit(1)
-
-    # Extract dependencies based on manifest type
-    if manifest_type == 'requirements.txt':
-        deps = extract_requirements_txt(str(file))
-    elif manifest_type == 'environment.yml':
-        deps = extract_environment_yml(str(file))
-    elif manifest_type == 'pyproject.toml':
-        deps = extract_pyproject_toml(str(file))
-    elif manifest_type == 'package.json':
-        deps = extract_package_json(str(file))
-    elif manifest_type == 'poetry.lock':
-        deps = extract_poetry_lock(str(file))
-    else:
-        typer.echo(f"Unsupported manifest type: {manifest_type}", err=True)
-        raise typer.Exit(1)
+            _print_fallback_human_readable(deps_data)
+        return
 
-    # Format output
-    deps_data = [dep.__dict__ for dep in deps]
+    by_file: Dict[Path, List[Dict[str, Any]]] = {}
+    for file, deps_data in _extract_many(files, manifest_types, raw):
+        if format == "json":
+            by_file[file] = deps_data
+        elif format == "ndjson":
+            for dep in deps_data:
+                _write_json({"file": str(file), **dep})
+        else:
+            typer.echo(f"\n==> {file} <==")
+            _print_fallback_human_readable(deps_data)
     if format == "json":
-        typer.echo(json.dumps(deps_data, indent=2))
-    else:
-        _print_fallback_human_readable(deps_data)
+        # One document for the whole run, keyed by path in argument order
+        _write_json({str(file): by_file[file] for file in files}, orjson.OPT_INDENT_2)
 
 @app.command()
 def health() -> None:
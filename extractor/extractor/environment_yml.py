@@ -1,8 +1,7 @@
-import yaml
 from core.models import Dependency
-from typing import List, Any, Dict, Union
+from typing import Iterator, List, Any, Dict, Union
 
-def extract_environment_yml(path: str) -> List[Dependency]:
+def extract_environment_yml(path: str, include_raw: bool = True) -> List[Dependency]:
     """Extract dependencies from a Conda environment.yml file.
     
     Parses a Conda environment.yml file and extracts both conda and pip dependencies.
@@ -10,6 +9,7 @@ def extract_environment_yml(path: str) -> List[Dependency]:
     
     Args:
         path: Path to the environment.yml file.
+        include_raw: Keep the original manifest entry on each Dependency's raw field.
         
     Returns:
         List of Dependency objects parsed from the file.
@@ -19,17 +19,31 @@ def extract_environment_yml(path: str) -> List[Dependency]:
         yaml.YAMLError: If the YAML file is malformed.
         UnicodeDecodeError: If the file cannot be decoded as UTF-8.
     """
-    dependencies: List[Dependency] = []
+    # Imported here so CLI commands that never parse YAML don't pay for loading it
+    import yaml
+    # Prefer the libyaml-backed loader when PyYAML was built with it
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
     with open(path, 'r', encoding='utf-8') as f:
-        data: Dict[str, Any] = yaml.safe_load(f)
-    for dep in data.get('dependencies', []):
+        data: Dict[str, Any] = yaml.load(f, Loader=loader)
+    return list(_iter_environment_deps(data.get('dependencies', []), include_raw))
+
+def _iter_environment_deps(entries: List[Any], include_raw: bool) -> Iterator[Dependency]:
+    """Yield dependencies from the parsed 'dependencies' list of an environment.yml.
+    
+    Args:
+        entries: Conda dependency strings and pip sub-sections, as loaded from YAML.
+        include_raw: Keep the original manifest entry on each Dependency's raw field.
+        
+    Yields:
+        Dependency objects in file order, with pip entries in place of their sub-section.
+    """
+    for dep in entries:
         if isinstance(dep, str):
             # Conda dependency
             name, *version = dep.split('=')
-            dependencies.append(Dependency(name=name.strip(), version='='.join(version) if version else None, source='conda', raw=dep))
+            yield Dependency(name=name.strip(), version='='.join(version) if version else None, source='conda', raw=dep if include_raw else None)
         elif isinstance(dep, dict) and 'pip' in dep:
             pip_deps: List[str] = dep['pip']
             for pip_dep in pip_deps:
                 name, *version = pip_dep.split('==')
-                dependencies.append(Dependency(name=name.strip(), version=version[0] if version else None, source='pip', raw=pip_dep))
-    return dependencies
\ No newline at end of file
+                yield Dependency(name=name.strip(), version=version[0] if version else None, source='pip', raw=pip_dep if include_raw else None)
@@ -1,8 +1,9 @@
-import json
+import orjson
+from itertools import chain
 from core.models import Dependency
 from typing import List, Dict, Any
 
-def extract_package_json(path: str) -> List[Dependency]:
+def extract_package_json(path: str, include_raw: bool = True) -> List[Dependency]:
     """Extract dependencies from a package.json file.
     
     Parses a package.json file and extracts both regular dependencies and
@@ -10,19 +11,19 @@ def extract_package_json(path: str) -> List[Dependency]:
     
     Args:
         path: Path to the package.json file.
+        include_raw: Keep the original manifest entry on each Dependency's raw field.
         
     Returns:
         List of Dependency objects parsed from the file.
         
     Raises:
         FileNotFoundError: If the package.json file does not exist.
-        json.JSONDecodeError: If the JSON file is malformed.
-        UnicodeDecodeError: If the file cannot be decoded as UTF-8.
+        orjson.JSONDecodeError: If the JSON file is malformed or not valid UTF-8.
     """
-    dependencies: List[Dependency] = []
-    with open(path, 'r', encoding='utf-8') as f:
-        data: Dict[str, Any] = json.load(f)
-    for section in ['dependencies', 'devDependencies']:
-        for name, version in data.get(section, {}).items():
-            dependencies.append(Dependency(name=name, version=version, source='npm', raw=f'{name}: {version}'))
-    return dependencies
\ No newline at end of file
+    with open(path, 'rb') as f:
+        data: Dict[str, Any] = orjson.loads(f.read())
+    sections = (data.get(section, {}).items() for section in ('dependencies', 'devDependencies'))
+    return [
+        Dependency(name=name, version=version, source='npm', raw=f'{name}: {version}' if include_raw else None)
+        for name, version in chain.from_iterable(sections)
+    ]
\ No newline at end of file
@@ -1,41 +1,36 @@
 from core.models import Dependency
-from typing import List, Optional
-import re
+from typing import List, Dict, Any
+import sys
 
-def extract_poetry_lock(path: str) -> List[Dependency]:
+def extract_poetry_lock(path: str, include_raw: bool = True) -> List[Dependency]:
     """Extract dependencies from a poetry.lock file.
     
-    Parses a poetry.lock file by splitting it into package sections and
-    extracting name, version, and category information. Only includes
+    Parses a poetry.lock file with the stdlib TOML parser and extracts name,
+    version, and category from each [[package]] table. Only includes
     packages marked as 'main' category (production dependencies).
     
     Args:
         path: Path to the poetry.lock file.
+        include_raw: Keep the original manifest entry on each Dependency's raw field.
         
     Returns:
         List of Dependency objects parsed from the file.
         
     Raises:
         FileNotFoundError: If the poetry.lock file does not exist.
-        UnicodeDecodeError: If the file cannot be decoded as UTF-8.
+        tomllib.TOMLDecodeError: If the lock file is malformed.
     """
+    # Imported here so CLI commands that never parse TOML don't pay for loading it
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:
+        import tomli as tomllib
     dependencies: List[Dependency] = []
-    with open(path, 'r', encoding='utf-8') as f:
-        content: str = f.read()
-    # Split into package sections
-    packages: List[str] = re.split(r'\n\[\[package\]\]\n', content)
-    for pkg in packages:
-        lines: List[str] = pkg.strip().splitlines()
-        name: Optional[str] = None
-        version: Optional[str] = None
-        category: Optional[str] = None
-        for line in lines:
-            if line.startswith('name = '):
-                name = line.split('=', 1)[1].strip().strip('"')
-            elif line.startswith('version = '):
-                version = line.split('=', 1)[1].strip().strip('"')
-            elif line.startswith('category = '):
-                category = line.split('=', 1)[1].strip().strip('"')
-        if name and category == 'main':
-            dependencies.append(Dependency(name=name, version=version, source='poetry.lock', raw=pkg.strip()))
-    return dependencies
\ No newline at end of file
+    with open(path, 'rb') as f:
+        data: Dict[str, Any] = tomllib.load(f)
+    for pkg in data.get('package', []):
+        name = pkg.get('name')
+        if name and pkg.get('category') == 'main':
+            version = pkg.get('version')
+            dependencies.append(Dependency(name=name, version=version, source='poetry.lock', raw=f'{name}: {version}' if include_raw else None))
+    return dependencies
@@ -1,8 +1,8 @@
-import toml
 from core.models import Dependency
 from typing import List, Dict, Any, Union
+import sys
 
-def extract_pyproject_toml(path: str) -> List[Dependency]:
+def extract_pyproject_toml(path: str, include_raw: bool = True) -> List[Dependency]:
     """Extract dependencies from a pyproject.toml file.
     
     Parses a pyproject.toml file and extracts Poetry dependencies from the
@@ -10,16 +10,23 @@ def extract_pyproject_toml(path: str) -> List[Dependency]:
     
     Args:
         path: Path to the pyproject.toml file.
+        include_raw: Keep the original manifest entry on each Dependency's raw field.
         
     Returns:
         List of Dependency objects parsed from the file.
         
     Raises:
         FileNotFoundError: If the pyproject.toml file does not exist.
-        toml.TomlDecodeError: If the TOML file is malformed.
+        tomllib.TOMLDecodeError: If the TOML file is malformed.
     """
+    # Imported here so CLI commands that never parse TOML don't pay for loading it
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:
+        import tomli as tomllib
     dependencies: List[Dependency] = []
-    data: Dict[str, Any] = toml.load(path)
+    with open(path, 'rb') as f:
+        data: Dict[str, Any] = tomllib.load(f)
     poetry_deps: Dict[str, Union[str, Dict[str, Any]]] = data.get('tool', {}).get('poetry', {}).get('dependencies', {})
     for name, version in poetry_deps.items():
         if name.lower() == 'python':
@@ -29,5 +36,5 @@ def extract_pyproject_toml(path: str) -> List[Dependency]:
             version_str = version.get('version')
         else:
             version_str = version
-        dependencies.append(Dependency(name=name, version=version_str, source='poetry', raw=f'{name}: {version_str}'))
+        dependencies.append(Dependency(name=name, version=version_str, source='poetry', raw=f'{name}: {version_str}' if include_raw else None))
     return dependencies
\ No newline at end of file
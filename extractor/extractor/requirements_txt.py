@@ -1,8 +1,13 @@
 from core.models import Dependency
-from typing import List, Optional
+from typing import Iterator, List, Optional
 import re
 
-def extract_requirements_txt(path: str) -> List[Dependency]:
+# Requirement line split into name, version operator, and version spec
+_REQ_RE = re.compile(r'([^=<>~!]+)([=<>~!]+)(.+)')
+# A bare project name or version with no operators, markers, or whitespace
+_PLAIN_TOKEN_RE = re.compile(r'[A-Za-z0-9._+-]+\Z')
+
+def extract_requirements_txt(path: str, include_raw: bool = True) -> List[Dependency]:
     """Extract dependencies from a requirements.txt file.
     
     Parses a requirements.txt file and extracts package names and versions.
@@ -10,6 +15,7 @@ def extract_requirements_txt(path: str) -> List[Dependency]:
     
     Args:
         path: Path to the requirements.txt file.
+        include_raw: Keep the original manifest entry on each Dependency's raw field.
         
     Returns:
         List of Dependency objects parsed from the file.
@@ -18,18 +24,33 @@ def extract_requirements_txt(path: str) -> List[Dependency]:
         FileNotFoundError: If the requirements.txt file does not exist.
         UnicodeDecodeError: If the file cannot be decoded as UTF-8.
     """
-    dependencies: List[Dependency] = []
+    return list(_iter_requirements_txt(path, include_raw))
+
+def _iter_requirements_txt(path: str, include_raw: bool) -> Iterator[Dependency]:
+    """Yield dependencies from a requirements.txt file one line at a time.
+    
+    Args:
+        path: Path to the requirements.txt file.
+        include_raw: Keep the original manifest entry on each Dependency's raw field.
+        
+    Yields:
+        Dependency objects in file order.
+    """
     with open(path, 'r', encoding='utf-8') as f:
         for line in f:
             line = line.strip()
             if not line or line.startswith('#'):
                 continue
+            # Fast path for simple 'name==version' pins, which skip the general regex
+            name, sep, version = line.partition('==')
+            name = name.strip()
+            version = version.strip()
+            if sep and _PLAIN_TOKEN_RE.match(name) and _PLAIN_TOKEN_RE.match(version):
+                yield Dependency(name=name, version=version, source='pypi', raw=line if include_raw else None)
+                continue
             # Split on '==' or '>=' or '<=' or '~=' or '>' or '<' or '='
-            match = re.match(r'([^=<>~!]+)([=<>~!]+)(.+)', line)
+            match = _REQ_RE.match(line)
             if match:
-                name = match.group(1).strip()
-                version = match.group(3).strip()
-                dependencies.append(Dependency(name=name, version=version, source='pypi', raw=line))
+                yield Dependency(name=match.group(1).strip(), version=match.group(3).strip(), source='pypi', raw=line if include_raw else None)
             else:
-                dependencies.append(Dependency(name=line, source='pypi', raw=line))
-    return dependencies
\ No newline at end of file
+                yield Dependency(name=line, source='pypi', raw=line if include_raw else None)
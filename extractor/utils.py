@@ -1,6 +1,14 @@
+import hashlib
+import mmap
+import os
 from pathlib import Path
 from typing import Union
 
+# Bytes read per chunk when hashing files
+_DIGEST_CHUNK_SIZE = 1 << 16
+# Files at least this large are hashed through a memory map instead of chunked reads
+_DIGEST_MMAP_MIN_SIZE = 1 << 16
+
 def read_file_text(path: Union[str, Path]) -> str:
     """Read the entire contents of a text file.
     
@@ -16,4 +24,35 @@ def read_file_text(path: Union[str, Path]) -> str:
         PermissionError: If there are insufficient permissions to read the file.
     """
     with open(path, 'r', encoding='utf-8') as f:
-        return f.read()
\ No newline at end of file
+        return f.read()
+
+def file_digest(path: Union[str, Path]) -> str:
+    """Compute a BLAKE2b digest of a file's contents.
+    
+    Large files are hashed straight from a read-only memory map, skipping the copy
+    into user space; smaller ones are read into one reused buffer.
+    
+    Args:
+        path: File path as string or Path object.
+        
+    Returns:
+        The first 32 hex characters of the file's BLAKE2b digest.
+        
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        PermissionError: If there are insufficient permissions to read the file.
+    """
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= _DIGEST_MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+            return digest.hexdigest()[:32]
+        buffer = bytearray(_DIGEST_CHUNK_SIZE)
+        view = memoryview(buffer)
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            digest.update(view[:size])
+    return digest.hexdigest()[:32]
@@ -0,0 +1,69 @@
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from analyzer.main import app
+from analyzer.services import dependency_extractor, http_client, package_info, repo_health
+
+# Canned upstream responses served by the app's HTTP client; any other URL gets a 404,
+# so no test ever reaches the real registries or forges
+UPSTREAM_ROUTES = {
+    "https://api.github.com/repos/expressjs/express": {
+        "pushed_at": "2024-01-01T00:00:00Z",
+        "open_issues_count": 10,
+        "stargazers_count": 100,
+        "forks_count": 20
+    },
+    "https://api.github.com/repos/expressjs/express/contents": [
+        {"name": "README.md", "type": "file"},
+        {"name": "LICENSE", "type": "file"}
+    ],
+}
+
+# GitHub rate-limit budget as the module starts out, restored between tests
+_RL_STATE_DEFAULTS = dict(repo_health._rl_state)
+
+@pytest.fixture(autouse=True)
+def reset_service_caches():
+    """Start and finish every test with empty in-process caches, so no test sees another's state"""
+    def reset():
+        package_info._metadata_cache.clear()
+        package_info._inflight.clear()
+        repo_health._health_cache.clear()
+        repo_health._etag_cache.clear()
+        repo_health._rl_state.update(_RL_STATE_DEFAULTS)
+        for extract in (
+            dependency_extractor.extract_requirements_txt_from_content,
+            dependency_extractor.extract_package_json_from_content,
+            dependency_extractor.extract_pyproject_toml_from_content,
+            dependency_extractor.extract_environment_yml_from_content,
+            dependency_extractor.extract_poetry_lock_from_content,
+        ):
+            extract.cache_clear()
+    reset()
+    yield
+    reset()
+
+# Upstream URLs answered with a 301 to another URL, as for renamed repositories
+UPSTREAM_REDIRECTS = {}
+
+def _upstream_handler(request: httpx.Request) -> httpx.Response:
+    """Answer an outbound request from UPSTREAM_REDIRECTS or UPSTREAM_ROUTES"""
+    url = str(request.url.copy_with(query=None))
+    location = UPSTREAM_REDIRECTS.get(url)
+    if location is not None:
+        return httpx.Response(301, headers={"Location": location})
+    payload = UPSTREAM_ROUTES.get(url)
+    if payload is None:
+        return httpx.Response(404, json={"message": "Not Found"})
+    return httpx.Response(200, json=payload)
+
+@pytest.fixture(scope="module")
+def client():
+    """Test client with the app lifespan entered once per module and upstream HTTP mocked"""
+    # Built by the real factory so the app's client settings (e.g. redirects) apply to mocked traffic
+    mock_client = http_client.create_client(transport=httpx.MockTransport(_upstream_handler))
+    with patch.object(http_client, 'create_client', return_value=mock_client):
+        with TestClient(app) as test_client:
+            yield test_client
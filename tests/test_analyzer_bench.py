@@ -0,0 +1,63 @@
+import pytest
+
+from conftest import UPSTREAM_ROUTES
+
+# Timing tests only run where pytest-benchmark is installed (the dev extra)
+pytest.importorskip("pytest_benchmark")
+
+# A 50-dependency manifest, large enough that per-dependency overhead dominates
+PACKAGE_COUNT = 50
+REQUIREMENTS_50 = "\n".join(f"pkg{i}==1.0.0" for i in range(PACKAGE_COUNT))
+
+
+def _pypi_payload(name):
+    """A PyPI JSON API payload shaped like a real project's, pointing at its own GitHub repository"""
+    return {
+        "info": {
+            "name": name,
+            "summary": f"The {name} package",
+            "version": "1.0.0",
+            "project_urls": {
+                "Documentation": f"https://{name}.readthedocs.io",
+                "Source": f"https://github.com/example/{name}"
+            }
+        },
+        "releases": {
+            "1.0.0": [{"upload_time_iso_8601": "2024-05-01T12:00:00.000000Z"}]
+        }
+    }
+
+
+class TestAnalyzerBenchmarks:
+    """Timing tests for the analyzer's hot endpoints"""
+
+    def test_analyze_requirements_txt_benchmark(self, benchmark, client, monkeypatch):
+        """Benchmark /v1/analyze with a 50-dependency requirements.txt served by the mocked registries and GitHub"""
+        for i in range(PACKAGE_COUNT):
+            name = f"pkg{i}"
+            monkeypatch.setitem(UPSTREAM_ROUTES, f"https://pypi.org/pypi/{name}/json", _pypi_payload(name))
+            monkeypatch.setitem(UPSTREAM_ROUTES, f"https://api.github.com/repos/example/{name}", {
+                "pushed_at": "2024-05-01T12:00:00Z",
+                "open_issues_count": 3,
+                "stargazers_count": 42,
+                "forks_count": 7
+            })
+            monkeypatch.setitem(UPSTREAM_ROUTES, f"https://api.github.com/repos/example/{name}/contents", [
+                {"name": "README.md", "type": "file"},
+                {"name": "LICENSE", "type": "file"}
+            ])
+        request_data = {
+            "manifest_content": REQUIREMENTS_50,
+            "manifest_type": "requirements.txt",
+            "policy": {}
+        }
+
+        response = benchmark(client.post, "/v1/analyze", json=request_data)
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert len(results) == PACKAGE_COUNT
+        assert all("error" not in result for result in results)
+        assert results[0]["package_info"]["repository_url"] == "https://github.com/example/pkg0"
+        assert results[0]["package_info"]["created_date"] == "2024-05-01T12:00:00.000000Z"
+        assert results[0]["health"]["repo_name"] == "pkg0"
@@ -1,19 +1,53 @@
 import pytest
 import json
-import tempfile
-import os
-import sys
+import asyncio
 from unittest.mock import patch, Mock
-from fastapi.testclient import TestClient
-from io import BytesIO
+from types import MappingProxyType
 
-# Add the project root to the Python path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from analyzer.main import app
+from analyzer import main
 from analyzer.models.schemas import AnalysisRequest, Policy
-
-client = TestClient(app)
+from core.models import Dependency
+from conftest import UPSTREAM_REDIRECTS, UPSTREAM_ROUTES
+
+# Read-only registry payloads shared by the tests that stub package_info lookups
+PYPI_REQUESTS_INFO = MappingProxyType({
+    "info": {
+        "summary": "Python HTTP library",
+        "version": "2.25.0",
+        "project_urls": {
+            "Source": "https://github.com/psf/requests"
+        }
+    }
+})
+NPM_EXPRESS_INFO = MappingProxyType({
+    "description": "Fast, unopinionated web framework",
+    "dist-tags": {"latest": "4.17.1"},
+    "repository": {
+        "url": "git+https://github.com/expressjs/express.git"
+    }
+})
+NPM_GENERIC_INFO = MappingProxyType({
+    "description": "Package",
+    "dist-tags": {"latest": "1.0.0"}
+})
+
+# Manifest contents shared by the inline and file-upload endpoint tests; upload bodies are bytes
+EXPRESS_PACKAGE_JSON = '{"dependencies": {"express": "^4.17.1"}}'
+EXPRESS_LODASH_PACKAGE_JSON = '{"dependencies": {"express": "^4.17.1", "lodash": "^4.17.21"}}'
+ENVIRONMENT_YML = b"""name: test-env
+dependencies:
+  - python=3.9
+  - requests==2.25.0
+"""
+PYPROJECT_TOML = b"""[tool.poetry.dependencies]
+python = "^3.9"
+requests = "^2.25.0"
+"""
+POETRY_LOCK = b"""[[package]]
+name = "requests"
+version = "2.25.0"
+category = "main"
+"""
 
 
 class TestAnalyzerMain:
@@ -21,29 +55,16 @@ class TestAnalyzerMain:
 
     @patch('analyzer.services.package_info.get_library_info')
     @patch('analyzer.services.repo_health.check_github_health')
-    def test_analyze_endpoint_requirements_txt(self, mock_health_check, mock_package_info):
+    def test_analyze_endpoint_requirements_txt(self, mock_health_check, mock_package_info, client):
         """Test analyze endpoint with requirements.txt content"""
-        # Mock package info response
-        mock_package_info.return_value = {
-            "info": {
-                "summary": "Python HTTP library",
-                "version": "2.25.0"
-            },
-            "project_urls": {
-                "Source": "https://github.com/psf/requests"
-            }
-        }
-        
-        # Mock health check response
-        mock_health_result = Mock()
-        mock_health_result.dict.return_value = {
-            "repository_url": "https://github.com/psf/requests",
-            "platform": "github",
-            "is_healthy": True,
-            "warnings": [],
-            "errors": []
-        }
-        mock_health_check.return_value = mock_health_result
+        from analyzer.models.schemas import HealthCheckResult
+        mock_package_info.return_value = PYPI_REQUESTS_INFO
+        mock_health_check.return_value = HealthCheckResult(
+            repository_url="https://github.com/psf/requests",
+            platform="github",
+            owner="psf",
+            repo_name="requests"
+        )
 
         request_data = {
             "manifest_content": "requests==2.25.0\ndjango>=3.2.0",
@@ -58,12 +79,44 @@ class TestAnalyzerMain:
         response = client.post("/v1/analyze", json=request_data)
 
         assert response.status_code == 200
-        data = response.json()
-        assert "results" in data
-        assert len(data["results"]) == 2
-        assert data["results"][0]["dependency"] == "requests"
+        results = response.json()["results"]
+        assert len(results) == 2
+        assert results[0]["dependency"] == "requests"
+        assert results[0]["health"]["repo_name"] == "requests"
+
+    @patch('analyzer.services.package_info.get_library_info')
+    @patch('analyzer.services.repo_health.check_github_health')
+    def test_analyze_endpoint_shared_repository_checked_once(self, mock_health_check, mock_package_info, client):
+        """Test dependencies hosted in the same repository share one health check"""
+        from analyzer.models.schemas import HealthCheckResult
+        mock_package_info.return_value = {
+            "info": {
+                "summary": "Namespace package",
+                "version": "1.0.0",
+                "project_urls": {"Source": "https://github.com/example/monorepo"}
+            }
+        }
+        mock_health_check.return_value = HealthCheckResult(
+            repository_url="https://github.com/example/monorepo",
+            platform="github",
+            owner="example",
+            repo_name="monorepo"
+        )
 
-    def test_analyze_endpoint_unsupported_manifest(self):
+        request_data = {
+            "manifest_content": "example-core==1.0.0\nexample-cli==1.0.0",
+            "manifest_type": "requirements.txt",
+            "policy": {}
+        }
+
+        response = client.post("/v1/analyze", json=request_data)
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["health"]["repo_name"] for r in results] == ["monorepo", "monorepo"]
+        assert mock_health_check.await_count == 1
+
+    def test_analyze_endpoint_unsupported_manifest(self, client):
         """Test analyze endpoint with unsupported manifest type"""
         request_data = {
             "manifest_content": "some content",
@@ -74,22 +127,16 @@ class TestAnalyzerMain:
         response = client.post("/v1/analyze", json=request_data)
 
         assert response.status_code == 400
-        assert "Unsupported manifest type" in response.json()["detail"]
+        assert b"Unsupported manifest type" in response.content
 
     @patch('analyzer.services.package_info.get_npm_info')
-    def test_analyze_endpoint_package_json(self, mock_npm_info):
+    def test_analyze_endpoint_package_json(self, mock_npm_info, client):
         """Test analyze endpoint with package.json content"""
         # Mock npm info response
-        mock_npm_info.return_value = {
-            "description": "Fast, unopinionated web framework",
-            "dist-tags": {"latest": "4.17.1"},
-            "repository": {
-                "url": "git+https://github.com/expressjs/express.git"
-            }
-        }
+        mock_npm_info.return_value = NPM_EXPRESS_INFO
 
         request_data = {
-            "manifest_content": '{"dependencies": {"express": "^4.17.1"}}',
+            "manifest_content": EXPRESS_PACKAGE_JSON,
             "manifest_type": "package.json",
             "policy": {}
         }
@@ -101,121 +148,101 @@ class TestAnalyzerMain:
         assert "results" in data
         assert len(data["results"]) == 1
         assert data["results"][0]["dependency"] == "express"
+        assert data["results"][0]["health"]["stars_count"] == 100
+        assert data["results"][0]["health"]["has_license"] is True
 
-    def test_analyze_file_endpoint_requirements_txt(self):
-        """Test analyze file endpoint with requirements.txt file"""
-        # Create a temporary requirements.txt file
-        content = "requests==2.25.0\ndjango>=3.2.0"
-        file_data = BytesIO(content.encode('utf-8'))
-
-        with patch('analyzer.services.package_info.get_library_info') as mock_package_info:
-            mock_package_info.return_value = None  # Simulate package not found
-
-            response = client.post(
-                "/v1/analyze/file",
-                files={"file": ("requirements.txt", file_data, "text/plain")}
-            )
-
-            assert response.status_code == 200
-            data = response.json()
-            assert "results" in data
-            assert len(data["results"]) == 2
-
-    def test_analyze_file_endpoint_unsupported_filename(self):
-        """Test analyze file endpoint with unsupported filename"""
-        content = "some content"
-        file_data = BytesIO(content.encode('utf-8'))
-
-        response = client.post(
-            "/v1/analyze/file",
-            files={"file": ("unsupported.txt", file_data, "text/plain")}
-        )
-
-        assert response.status_code == 400
-        assert "Could not infer manifest type" in response.json()["detail"]
-
-    def test_analyze_file_endpoint_package_json(self):
-        """Test analyze file endpoint with package.json file"""
-        content = '{"dependencies": {"express": "^4.17.1"}}'
-        file_data = BytesIO(content.encode('utf-8'))
-
-        with patch('analyzer.services.package_info.get_npm_info') as mock_npm_info:
-            mock_npm_info.return_value = None  # Simulate package not found
-
-            response = client.post(
-                "/v1/analyze/file",
-                files={"file": ("package.json", file_data, "application/json")}
-            )
+    @patch('analyzer.services.package_info.get_npm_info')
+    def test_analyze_endpoint_follows_renamed_repository(self, mock_npm_info, client, monkeypatch):
+        """Test a GitHub 301 for a renamed repository is followed to the current repository"""
+        mock_npm_info.return_value = {
+            **NPM_EXPRESS_INFO,
+            "repository": {"url": "git+https://github.com/expressjs/old-express.git"}
+        }
+        old_repo = "https://api.github.com/repos/expressjs/old-express"
+        new_repo = "https://api.github.com/repos/expressjs/express"
+        monkeypatch.setitem(UPSTREAM_REDIRECTS, old_repo, new_repo)
+        monkeypatch.setitem(UPSTREAM_REDIRECTS, f"{old_repo}/contents", f"{new_repo}/contents")
 
-            assert response.status_code == 200
-            data = response.json()
-            assert "results" in data
-            assert len(data["results"]) == 1
+        response = client.post("/v1/analyze", json={"manifest_content": EXPRESS_PACKAGE_JSON, "manifest_type": "package.json"})
 
-    def test_analyze_file_endpoint_environment_yml(self):
-        """Test analyze file endpoint with environment.yml file"""
-        content = """name: test-env
-dependencies:
-  - python=3.9
-  - requests==2.25.0
-"""
-        file_data = BytesIO(content.encode('utf-8'))
+        assert response.status_code == 200
+        health = response.json()["results"][0]["health"]
+        assert health["errors"] == []
+        assert health["stars_count"] == 100
+        assert health["has_license"] is True
+
+    def test_analyze_endpoint_mixed_case_pypi_name(self, client, monkeypatch):
+        """Test a mixed-case PyPI name resolves through PyPI's redirect from the PEP 503 name"""
+        monkeypatch.setitem(UPSTREAM_REDIRECTS, "https://pypi.org/pypi/django/json", "https://pypi.org/pypi/Django/json")
+        monkeypatch.setitem(UPSTREAM_ROUTES, "https://pypi.org/pypi/Django/json", {
+            "info": {
+                "name": "Django",
+                "summary": "A high-level Python web framework.",
+                "version": "4.2.0",
+                "project_urls": {"Source": "https://github.com/django/django"}
+            },
+            "releases": {"4.2.0": [{"upload_time_iso_8601": "2023-04-03T08:36:16.829178Z"}]}
+        })
 
-        with patch('analyzer.services.package_info.get_library_info') as mock_package_info:
-            mock_package_info.return_value = None
+        response = client.post("/v1/analyze", json={"manifest_content": "Django==4.2.0", "manifest_type": "requirements.txt"})
 
-            response = client.post(
-                "/v1/analyze/file",
-                files={"file": ("environment.yml", file_data, "text/yaml")}
-            )
+        assert response.status_code == 200
+        result = response.json()["results"][0]
+        assert result["dependency"] == "Django"
+        assert result["package_info"]["summary"] == "A high-level Python web framework."
+        assert result["package_info"]["repository_url"] == "https://github.com/django/django"
 
-            assert response.status_code == 200
-            data = response.json()
-            assert "results" in data
+    @patch('analyzer.services.package_info.get_npm_info')
+    def test_analyze_stream_endpoint(self, mock_npm_info, client):
+        """Test streaming analyze endpoint emits one NDJSON result per dependency"""
+        mock_npm_info.return_value = NPM_GENERIC_INFO
 
-    def test_analyze_file_endpoint_pyproject_toml(self):
-        """Test analyze file endpoint with pyproject.toml file"""
-        content = """[tool.poetry.dependencies]
-python = "^3.9"
-requests = "^2.25.0"
-"""
-        file_data = BytesIO(content.encode('utf-8'))
+        request_data = {
+            "manifest_content": EXPRESS_LODASH_PACKAGE_JSON,
+            "manifest_type": "package.json",
+            "policy": {}
+        }
 
-        with patch('analyzer.services.package_info.get_library_info') as mock_package_info:
-            mock_package_info.return_value = None
+        response = client.post("/v1/analyze/stream", json=request_data)
 
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(r["dependency"] for r in results) == ["express", "lodash"]
+
+    @pytest.mark.parametrize("filename,content,content_type,lookup,expected_count", [
+        ("requirements.txt", b"requests==2.25.0\ndjango>=3.2.0", "text/plain", "get_library_info", 2),
+        ("package.json", EXPRESS_PACKAGE_JSON.encode(), "application/json", "get_npm_info", 1),
+        ("environment.yml", ENVIRONMENT_YML, "text/yaml", "get_library_info", 2),
+        ("pyproject.toml", PYPROJECT_TOML, "text/plain", "get_library_info", 1),
+        ("poetry.lock", POETRY_LOCK, "text/plain", "get_library_info", 1),
+    ], ids=["requirements.txt", "package.json", "environment.yml", "pyproject.toml", "poetry.lock"])
+    def test_analyze_file_endpoint(self, client, filename, content, content_type, lookup, expected_count):
+        """Test analyze file endpoint infers the manifest type from each supported filename"""
+        # Simulate package not found
+        with patch(f'analyzer.services.package_info.{lookup}', return_value=None):
             response = client.post(
                 "/v1/analyze/file",
-                files={"file": ("pyproject.toml", file_data, "text/plain")}
+                files={"file": (filename, content, content_type)}
             )
 
-            assert response.status_code == 200
-            data = response.json()
-            assert "results" in data
-
-    def test_analyze_file_endpoint_poetry_lock(self):
-        """Test analyze file endpoint with poetry.lock file"""
-        content = """[[package]]
-name = "requests"
-version = "2.25.0"
-category = "main"
-"""
-        file_data = BytesIO(content.encode('utf-8'))
-
-        with patch('analyzer.services.package_info.get_library_info') as mock_package_info:
-            mock_package_info.return_value = None
+        assert response.status_code == 200
+        data = response.json()
+        assert "results" in data
+        assert len(data["results"]) == expected_count
 
-            response = client.post(
-                "/v1/analyze/file",
-                files={"file": ("poetry.lock", file_data, "text/plain")}
-            )
+    def test_analyze_file_endpoint_unsupported_filename(self, client):
+        """Test analyze file endpoint with unsupported filename"""
+        response = client.post(
+            "/v1/analyze/file",
+            files={"file": ("unsupported.txt", b"some content", "text/plain")}
+        )
 
-            assert response.status_code == 200
-            data = response.json()
-            assert "results" in data
+        assert response.status_code == 400
+        assert b"Could not infer manifest type" in response.content
 
     @patch('analyzer.services.package_info.get_library_info')
-    def test_analyze_conda_package_not_found(self, mock_package_info):
+    def test_analyze_conda_package_not_found(self, mock_package_info, client):
         """Test analyze endpoint with conda package not found in PyPI"""
         mock_package_info.return_value = None
 
@@ -234,16 +261,61 @@ category = "main"
         assert data["results"][0]["error"] is True
         assert "conda-only or system package" in data["results"][0]["message"]
 
-    def test_analyze_file_no_filename(self):
-        """Test analyze file endpoint with no filename"""
-        content = "requests==2.25.0"
-        file_data = BytesIO(content.encode('utf-8'))
+    def test_analyze_endpoint_invalid_dependency_name(self, client):
+        """Test that a failing dependency lookup is reported without failing the request"""
+        request_data = {
+            "manifest_content": "django[bcrypt]==3.2.0",
+            "manifest_type": "requirements.txt",
+            "policy": {}
+        }
+
+        response = client.post("/v1/analyze", json=request_data)
 
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["results"]) == 1
+        assert data["results"][0]["dependency"] == "django[bcrypt]"
+        assert data["results"][0]["error"] is True
+        assert "Invalid library name" in data["results"][0]["message"]
+
+    def test_analyze_file_no_filename(self, client):
+        """Test analyze file endpoint with no filename"""
         # Create file upload without filename
         response = client.post(
             "/v1/analyze/file",
-            files={"file": (None, file_data, "text/plain")}
+            files={"file": (None, b"requests==2.25.0", "text/plain")}
         )
 
         # FastAPI returns 422 for validation errors, not 400
-        assert response.status_code == 422
\ No newline at end of file
+        assert response.status_code == 422
+
+    @patch('analyzer.services.package_info.get_npm_info')
+    def test_cancelled_dependency_keeps_shared_health_check(self, mock_npm_info, monkeypatch):
+        """Test cancelling one dependency doesn't abort a health check another dependency shares"""
+        mock_npm_info.return_value = NPM_EXPRESS_INFO
+
+        async def scenario():
+            monkeypatch.setattr(main.app.state, "host_limits", {"npm": asyncio.Semaphore(1)}, raising=False)
+            release = asyncio.Event()
+
+            async def check_repo_health(*args):
+                await release.wait()
+                return {"stars_count": 100}
+
+            monkeypatch.setattr(main, "_check_repo_health", check_repo_health)
+            health_tasks = {}
+            first, second = (
+                asyncio.create_task(main.process_dep(Dependency(name=name, source="npm"), Mock(), Policy(), health_tasks))
+                for name in ("express", "express-alias")
+            )
+            # Let both dependencies start waiting on the one health check they share
+            while not health_tasks or mock_npm_info.await_count < 2:
+                await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            first.cancel()
+            release.set()
+            return await second
+
+        result = asyncio.run(scenario())
+
+        assert result["health"] == {"stars_count": 100}
@@ -1,10 +1,7 @@
 import pytest
-import sys
-import os
-from unittest.mock import patch, Mock
-
-# Add the project root to the Python path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import asyncio
+import httpx
+from unittest.mock import AsyncMock, Mock
 
 from analyzer.services.package_info import (
     get_library_info,
@@ -22,127 +19,66 @@ class TestPackageInfoExtended:
     def test_get_npm_info_invalid_name(self):
         """Test npm package info with invalid name"""
         with pytest.raises(ValueError):
-            get_npm_info("invalid@name")
+            asyncio.run(get_npm_info(Mock(), "invalid@name"))
 
-    @patch('analyzer.services.package_info.requests.get')
-    def test_get_npm_info_failure(self, mock_get):
+    def test_get_npm_info_failure(self):
         """Test failed npm package info retrieval"""
-        from requests.exceptions import RequestException
-        mock_get.side_effect = RequestException("Network error")
+        client = Mock(get=AsyncMock(side_effect=httpx.RequestError("Network error")))
 
-        result = get_npm_info("nonexistent")
+        result = asyncio.run(get_npm_info(client, "nonexistent"))
 
         assert result is None
 
-    def test_parse_repo_url_git_prefix(self):
-        """Test parsing repository URL with git+ prefix"""
-        url = "git+https://github.com/user/repo.git"
-        platform, org, repo = parse_repo_url(url)
-
-        assert platform == "github"
-        assert org == "user"
-        assert repo == "repo"
-
-    def test_parse_repo_url_bitbucket(self):
-        """Test parsing Bitbucket repository URL"""
-        url = "https://bitbucket.org/user/repo"
-        platform, org, repo = parse_repo_url(url)
-
-        assert platform == "bitbucket"
-        assert org == "user"
-        assert repo == "repo"
-
-    def test_parse_repo_url_subdomain_github(self):
-        """Test parsing GitHub Enterprise subdomain URL"""
-        url = "https://github.example.com/user/repo"
-        platform, org, repo = parse_repo_url(url)
-
-        # The current implementation only recognizes exact github.com domains
-        assert platform is None
-        assert org is None
-        assert repo is None
-
-    def test_parse_repo_url_subdomain_gitlab(self):
-        """Test parsing GitLab self-hosted subdomain URL"""
-        url = "https://gitlab.example.com/group/project"
-        platform, org, repo = parse_repo_url(url)
-
-        # The current implementation only recognizes exact gitlab.com domains
-        assert platform is None
-        assert org is None
-        assert repo is None
-
-    def test_parse_repo_url_insufficient_path_parts(self):
-        """Test parsing URL with insufficient path parts"""
-        url = "https://github.com/user"
-        platform, org, repo = parse_repo_url(url)
-
-        assert platform is None
-        assert org is None
-        assert repo is None
-
-    def test_extract_repo_info_no_project_urls(self):
-        """Test extracting repo info when project_urls is missing"""
-        info = {"name": "test-package"}
-
-        repo_url, platform, org, repo = extract_repo_info(info)
-
-        assert repo_url is None
-        assert platform is None
-        assert org is None
-        assert repo is None
-
-    def test_extract_repo_info_secondary_types(self):
-        """Test extracting repo info using secondary URL types"""
-        info = {
-            "project_urls": {
-                "Documentation": "https://docs.example.com",
-                "Homepage": "https://github.com/user/repo",
-                "Bug Tracker": "https://github.com/user/repo/issues"
-            }
-        }
-
-        repo_url, platform, org, repo = extract_repo_info(info)
-
-        assert repo_url == "https://github.com/user/repo"
-        assert platform == "github"
-        assert org == "user"
-        assert repo == "repo"
-
-    def test_extract_repo_info_fallback_types(self):
-        """Test extracting repo info using fallback URL types"""
-        info = {
-            "project_urls": {
-                "Documentation": "https://docs.example.com",
-                "Bug Tracker": "https://github.com/user/repo/issues",
-                "Funding": "https://sponsor.example.com",
-                "Custom": "https://github.com/user/repo"
-            }
-        }
-
-        repo_url, platform, org, repo = extract_repo_info(info)
-
-        assert repo_url == "https://github.com/user/repo"
-        assert platform == "github"
-        assert org == "user"
-        assert repo == "repo"
-
-    def test_extract_repo_info_excluded_types_only(self):
-        """Test extracting repo info when only excluded URL types exist"""
-        info = {
-            "project_urls": {
-                "Funding": "https://sponsor.example.com",
-                "Donate": "https://donate.example.com",
-                "Documentation": "https://docs.example.com"
-            }
-        }
-
-        repo_url, platform, org, repo = extract_repo_info(info)
-
-        assert repo_url is None
-        assert platform is None
-        assert org is None
-        assert repo is None
+    @pytest.mark.parametrize("url,expected", [
+        ("git+https://github.com/user/repo.git", ("github", "user", "repo")),
+        ("https://bitbucket.org/user/repo", ("bitbucket", "user", "repo")),
+        # Only the exact github.com and gitlab.com domains are recognized
+        ("https://github.example.com/user/repo", (None, None, None)),
+        ("https://gitlab.example.com/group/project", (None, None, None)),
+        ("https://github.com/user", (None, None, None)),
+        ("https://docs.example.com/user/repo", (None, None, None)),
+    ], ids=["git-prefix", "bitbucket", "github-subdomain", "gitlab-subdomain", "insufficient-path-parts", "unsupported-host"])
+    def test_parse_repo_url(self, url, expected):
+        """Test parsing repository URLs into platform, org, and repo"""
+        assert parse_repo_url(url) == expected
+
+    @pytest.mark.parametrize("info,expected", [
+        ({"name": "test-package"}, (None, None, None, None)),
+        (
+            {
+                "project_urls": {
+                    "Documentation": "https://docs.example.com",
+                    "Homepage": "https://github.com/user/repo",
+                    "Bug Tracker": "https://github.com/user/repo/issues"
+                }
+            },
+            ("https://github.com/user/repo", "github", "user", "repo"),
+        ),
+        (
+            {
+                "project_urls": {
+                    "Documentation": "https://docs.example.com",
+                    "Bug Tracker": "https://github.com/user/repo/issues",
+                    "Funding": "https://sponsor.example.com",
+                    "Custom": "https://github.com/user/repo"
+                }
+            },
+            ("https://github.com/user/repo", "github", "user", "repo"),
+        ),
+        (
+            {
+                "project_urls": {
+                    "Funding": "https://sponsor.example.com",
+                    "Donate": "https://donate.example.com",
+                    "Documentation": "https://docs.example.com"
+                }
+            },
+            (None, None, None, None),
+        ),
+    ], ids=["no-project-urls", "secondary-types", "fallback-types", "excluded-types-only"])
+    def test_extract_repo_info(self, info, expected):
+        """Test choosing the repository URL from PyPI project_urls"""
+        assert extract_repo_info(info) == expected
 
     def test_extract_npm_repo_info_no_repository(self):
         """Test extracting npm repo info when repository field is missing"""
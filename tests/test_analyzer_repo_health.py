@@ -1,49 +1,87 @@
 import pytest
-import sys
-import os
-from unittest.mock import patch, Mock
+import asyncio
+import httpx
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
 from datetime import datetime, timezone
 
-# Add the project root to the Python path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from analyzer.services.repo_health import check_github_health, check_gitlab_health
 from analyzer.models.schemas import Policy, HealthCheckResult
+from analyzer.services import repo_health
+
+# Policies shared read-only across tests
+STRICT_POLICY = Policy(max_inactive_days=365, require_license=True, require_readme=True)
+LAX_POLICY = Policy(max_inactive_days=365, require_license=False, require_readme=False)
+DEFAULT_POLICY = Policy()
+
+# Fixed "now" for activity checks; timestamps in tests are relative to it
+FROZEN_NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+class _FrozenDatetime(datetime):
+    """datetime whose now() always returns FROZEN_NOW"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return FROZEN_NOW if tz is None else FROZEN_NOW.astimezone(tz)
+
+def _fake_response(payload=None, status_code=200, headers=None):
+    """Lightweight stand-in for an httpx.Response carrying a fixed JSON payload"""
+    return SimpleNamespace(
+        status_code=status_code,
+        headers=headers if headers is not None else {},
+        json=lambda: payload,
+        raise_for_status=lambda: None
+    )
+
+def _github_get(repo_response, contents_response):
+    """Build a client.get side effect that answers GitHub API calls by URL, in any order"""
+    async def get(url, *args, **kwargs):
+        if url.endswith("/contents"):
+            return contents_response
+        return repo_response
+    return get
+
+def _gitlab_get(project_response, issues_response, tree_response):
+    """Build a client.get side effect that answers GitLab API calls by URL, in any order"""
+    async def get(url, *args, **kwargs):
+        if url.endswith("/issues"):
+            return issues_response
+        if url.endswith("/repository/tree"):
+            return tree_response
+        return project_response
+    return get
+
+@pytest.fixture
+def frozen_now(monkeypatch):
+    """Freeze the clock repo_health uses to measure inactivity"""
+    monkeypatch.setattr(repo_health, "datetime", _FrozenDatetime)
+    return FROZEN_NOW
 
 
 class TestRepoHealth:
     """Test repository health checking functionality"""
 
-    @patch('analyzer.services.repo_health.requests.get')
-    def test_check_github_health_success(self, mock_get):
+    def test_check_github_health_success(self):
         """Test successful GitHub health check"""
         # Mock repository response
-        repo_response = Mock()
-        repo_response.raise_for_status.return_value = None
-        repo_response.json.return_value = {
+        repo_response = _fake_response({
             "pushed_at": "2021-01-01T12:00:00Z",
             "stargazers_count": 100,
-            "forks_count": 50
-        }
-        
-        # Mock issues response
-        issues_response = Mock()
-        issues_response.raise_for_status.return_value = None
-        issues_response.json.return_value = [{"id": 1}, {"id": 2}]  # 2 open issues
+            "forks_count": 50,
+            "open_issues_count": 2
+        })
         
         # Mock contents response
-        contents_response = Mock()
-        contents_response.status_code = 200
-        contents_response.json.return_value = [
+        contents_response = _fake_response([
             {"name": "README.md"},
             {"name": "LICENSE"},
             {"name": "main.py"}
-        ]
+        ])
         
-        mock_get.side_effect = [repo_response, issues_response, contents_response]
+        client = Mock(get=AsyncMock(side_effect=_github_get(repo_response, contents_response)))
         
-        policy = Policy(max_inactive_days=365, require_license=True, require_readme=True)
-        result = check_github_health("user", "repo", policy, token="test_token")
+        policy = STRICT_POLICY
+        result = asyncio.run(check_github_health(client, "user", "repo", policy, token="test_token"))
         
         assert result.repository_url == "https://github.com/user/repo"
         assert result.platform == "github"
@@ -58,45 +96,33 @@ class TestRepoHealth:
         assert result.is_healthy is False  # Due to inactivity
         assert len(result.warnings) > 0
 
-    @patch('analyzer.services.repo_health.requests.get')
-    def test_check_github_health_network_error(self, mock_get):
+    def test_check_github_health_network_error(self):
         """Test GitHub health check with network error"""
-        from requests.exceptions import RequestException
-        mock_get.side_effect = RequestException("Network error")
+        client = Mock(get=AsyncMock(side_effect=httpx.RequestError("Network error")))
         
-        policy = Policy()
-        result = check_github_health("user", "repo", policy)
+        policy = DEFAULT_POLICY
+        result = asyncio.run(check_github_health(client, "user", "repo", policy))
         
         assert result.is_healthy is False
         assert len(result.errors) > 0
         assert "Error checking GitHub repository" in result.errors[0]
 
-    @patch('analyzer.services.repo_health.requests.get')
-    def test_check_github_health_missing_files(self, mock_get):
+    def test_check_github_health_missing_files(self):
         """Test GitHub health check when README/LICENSE missing"""
         # Mock repository response
-        repo_response = Mock()
-        repo_response.raise_for_status.return_value = None
-        repo_response.json.return_value = {
+        repo_response = _fake_response({
             "pushed_at": "2024-01-01T12:00:00Z",  # Recent activity
             "stargazers_count": 100,
             "forks_count": 50
-        }
-        
-        # Mock issues response
-        issues_response = Mock()
-        issues_response.raise_for_status.return_value = None
-        issues_response.json.return_value = []
+        })
         
         # Mock contents response - no README or LICENSE
-        contents_response = Mock()
-        contents_response.status_code = 200
-        contents_response.json.return_value = [{"name": "main.py"}]
+        contents_response = _fake_response([{"name": "main.py"}])
         
-        mock_get.side_effect = [repo_response, issues_response, contents_response]
+        client = Mock(get=AsyncMock(side_effect=_github_get(repo_response, contents_response)))
         
-        policy = Policy(max_inactive_days=365, require_license=True, require_readme=True)
-        result = check_github_health("user", "repo", policy)
+        policy = STRICT_POLICY
+        result = asyncio.run(check_github_health(client, "user", "repo", policy))
         
         assert result.has_readme is False
         assert result.has_license is False
@@ -104,94 +130,113 @@ class TestRepoHealth:
         assert "No README file found" in result.warnings
         assert "No LICENSE file found" in result.warnings
 
-    @patch('analyzer.services.repo_health.requests.get')
-    def test_check_github_health_90_day_warning(self, mock_get):
+    def test_check_github_health_90_day_warning(self, frozen_now):
         """Test GitHub health check with 90 day inactivity warning"""
         # Mock repository response with activity more than 90 but less than 365 days ago
-        from datetime import datetime, timezone
-        from analyzer.services.repo_health import parse_iso8601_timestamp
-        
-        # Calculate a date that's about 180 days ago
-        import datetime as dt
-        now = dt.datetime.now(dt.timezone.utc)
-        past_date = now - dt.timedelta(days=180)
-        past_date_str = past_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        
-        repo_response = Mock()
-        repo_response.raise_for_status.return_value = None
-        repo_response.json.return_value = {
+        past_date_str = "2024-01-01T00:00:00Z"  # 152 days before FROZEN_NOW
+        
+        repo_response = _fake_response({
             "pushed_at": past_date_str,
             "stargazers_count": 100,
             "forks_count": 50
-        }
-        
-        # Mock issues response
-        issues_response = Mock()
-        issues_response.raise_for_status.return_value = None
-        issues_response.json.return_value = []
+        })
         
         # Mock contents response
-        contents_response = Mock()
-        contents_response.status_code = 200
-        contents_response.json.return_value = [
+        contents_response = _fake_response([
             {"name": "README.md"},
             {"name": "LICENSE"}
-        ]
+        ])
         
-        mock_get.side_effect = [repo_response, issues_response, contents_response]
+        client = Mock(get=AsyncMock(side_effect=_github_get(repo_response, contents_response)))
         
-        policy = Policy(max_inactive_days=365, require_license=False, require_readme=False)
-        result = check_github_health("user", "repo", policy)
+        policy = LAX_POLICY
+        result = asyncio.run(check_github_health(client, "user", "repo", policy))
         
         assert "Repository has been inactive for over 90 days" in result.warnings
 
-    @patch('analyzer.services.repo_health.requests.get')
-    def test_check_gitlab_health_success(self, mock_get):
+    def test_check_github_health_rate_limited(self):
+        """Test GitHub health check short-circuits once the rate limit is exhausted"""
+        repo_response = _fake_response(
+            {"stargazers_count": 1, "forks_count": 1},
+            headers={"x-ratelimit-remaining": "0", "x-ratelimit-reset": "4102444800"}
+        )
+        contents_response = _fake_response(status_code=404)
+        client = Mock(get=AsyncMock(side_effect=_github_get(repo_response, contents_response)))
+
+        policy = DEFAULT_POLICY
+        asyncio.run(check_github_health(client, "user", "repo", policy))
+        result = asyncio.run(check_github_health(client, "user", "other", policy))
+
+        assert client.get.await_count == 2
+        assert result.errors == ["github rate-limited"]
+        assert result.is_healthy is False
+
+    def test_github_get_revalidates_with_etag(self):
+        """Test a repeated GitHub request is revalidated and a 304 reuses the cached response"""
+        ok_response = _fake_response(headers={"etag": '"abc123"'})
+        not_modified_response = _fake_response(status_code=304)
+        client = Mock(get=AsyncMock(side_effect=[ok_response, not_modified_response]))
+        url = "https://api.github.com/repos/user/etag-repo"
+
+        first = asyncio.run(repo_health._github_get(client, url, {}))
+        second = asyncio.run(repo_health._github_get(client, url, {}))
+
+        assert first is ok_response
+        assert second is ok_response
+        client.get.assert_awaited_with(url, headers={"If-None-Match": '"abc123"'})
+
+    def test_check_health_cache_is_bounded(self, monkeypatch):
+        """Test memoized health checks evict the oldest entry and drop expired ones on read"""
+        monkeypatch.setattr(repo_health, 'HEALTH_CACHE_MAXSIZE', 2)
+        check = AsyncMock(side_effect=lambda client, owner, repo, policy, token=None: HealthCheckResult(
+            repository_url=f"https://github.com/{owner}/{repo}", platform="github", owner=owner, repo_name=repo
+        ))
+        monkeypatch.setattr(repo_health, 'check_github_health', check)
+
+        for repo in ("a", "b", "c"):
+            asyncio.run(repo_health.check_health(Mock(), "github", "user", repo, DEFAULT_POLICY))
+        assert [key[2] for key in repo_health._health_cache] == ["b", "c"]
+
+        monkeypatch.setattr(repo_health, 'HEALTH_CACHE_TTL_SECONDS', -1)
+        asyncio.run(repo_health.check_health(Mock(), "github", "user", "d", DEFAULT_POLICY))
+        asyncio.run(repo_health.check_health(Mock(), "github", "user", "d", DEFAULT_POLICY))
+        assert check.await_count == 5
+        assert [key[2] for key in repo_health._health_cache] == ["c", "d"]
+
+    def test_check_gitlab_health_success(self, frozen_now):
         """Test successful GitLab health check"""
         # Use a more recent date to ensure the repo is considered healthy
-        import datetime as dt
-        now = dt.datetime.now(dt.timezone.utc)
-        recent_date = now - dt.timedelta(days=30)  # 30 days ago
-        recent_date_str = recent_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        recent_date_str = "2024-05-02T00:00:00Z"  # 30 days before FROZEN_NOW
         
         # Mock project response
-        project_response = Mock()
-        project_response.raise_for_status.return_value = None
-        project_response.json.return_value = {
+        project_response = _fake_response({
             "last_activity_at": recent_date_str,
             "star_count": 75,
             "forks_count": 25,
             "default_branch": "main"
-        }
+        })
         
         # Mock issues response
-        issues_response = Mock()
-        issues_response.raise_for_status.return_value = None
-        issues_response.json.return_value = [{"id": 1}]  # 1 open issue
-        
-        # Mock README file response
-        readme_response = Mock()
-        readme_response.status_code = 200
+        issues_response = _fake_response([{"id": 1}])  # 1 open issue
         
-        # Mock LICENSE file response
-        license_response = Mock()
-        license_response.status_code = 200
+        # Mock repository tree response
+        tree_response = _fake_response([
+            {"name": "README.md"},
+            {"name": "LICENSE"},
+            {"name": "src"}
+        ])
         
-        mock_get.side_effect = [
-            project_response, 
-            issues_response, 
-            readme_response,  # README.md check
-            license_response  # LICENSE check
-        ]
+        client = Mock(get=AsyncMock(side_effect=_gitlab_get(project_response, issues_response, tree_response)))
         
-        policy = Policy(max_inactive_days=365, require_license=True, require_readme=True)
-        result = check_gitlab_health("group", "project", policy, token="test_token")
+        policy = STRICT_POLICY
+        result = asyncio.run(check_gitlab_health(client, "group", "project", policy, token="test_token"))
         
         assert result.repository_url == "https://gitlab.com/group/project"
         assert result.platform == "gitlab"
         assert result.owner == "group"
         assert result.repo_name == "project"
         assert result.last_activity == recent_date_str
+        assert result.days_since_last_activity == 30
         assert result.open_issues_count == 1
         assert result.stars_count == 75
         assert result.forks_count == 25
@@ -199,36 +244,26 @@ class TestRepoHealth:
         assert result.has_license is True
         assert result.is_healthy is True
 
-    @patch('analyzer.services.repo_health.requests.get')
-    def test_check_gitlab_health_missing_files(self, mock_get):
+    def test_check_gitlab_health_missing_files(self):
         """Test GitLab health check when README/LICENSE missing"""
         # Mock project response
-        project_response = Mock()
-        project_response.raise_for_status.return_value = None
-        project_response.json.return_value = {
+        project_response = _fake_response({
             "last_activity_at": "2024-01-01T12:00:00Z",
             "star_count": 75,
             "forks_count": 25,
             "default_branch": "main"
-        }
+        })
         
         # Mock issues response
-        issues_response = Mock()
-        issues_response.raise_for_status.return_value = None
-        issues_response.json.return_value = []
+        issues_response = _fake_response([])
         
-        # Mock file responses - all return 404 (not found)
-        file_not_found_response = Mock()
-        file_not_found_response.status_code = 404
+        # Mock repository tree response without README/LICENSE files
+        tree_response = _fake_response([{"name": "main.py"}])
         
-        # There are multiple README and LICENSE file checks, so mock many 404s
-        mock_get.side_effect = [
-            project_response, 
-            issues_response
-        ] + [file_not_found_response] * 20  # Many file checks
+        client = Mock(get=AsyncMock(side_effect=_gitlab_get(project_response, issues_response, tree_response)))
         
-        policy = Policy(max_inactive_days=365, require_license=True, require_readme=True)
-        result = check_gitlab_health("group", "project", policy)
+        policy = STRICT_POLICY
+        result = asyncio.run(check_gitlab_health(client, "group", "project", policy))
         
         assert result.has_readme is False
         assert result.has_license is False
@@ -236,14 +271,39 @@ class TestRepoHealth:
         assert "No README file found" in result.warnings
         assert "No LICENSE file found" in result.warnings
 
-    @patch('analyzer.services.repo_health.requests.get')
-    def test_check_gitlab_health_network_error(self, mock_get):
+    def test_check_gitlab_health_truncated_tree_probes_files(self):
+        """Test GitLab health check probes README/LICENSE with HEAD when the root listing is truncated"""
+        project_response = _fake_response({"default_branch": "main"})
+        issues_response = _fake_response([])
+        tree_response = _fake_response([{"name": "README.md"}], headers={"x-next-page": "2"})
+
+        async def head(url, headers, params):
+            return _fake_response(status_code=200 if url.endswith("/repository/files/LICENSE") else 404)
+
+        client = Mock(
+            get=AsyncMock(side_effect=_gitlab_get(project_response, issues_response, tree_response)),
+            head=AsyncMock(side_effect=head)
+        )
+
+        policy = STRICT_POLICY
+        result = asyncio.run(check_gitlab_health(client, "group", "project", policy))
+
+        assert result.has_readme is True
+        assert result.has_license is True
+        # Only LICENSE candidates are probed, since the listing already had a README
+        assert client.head.await_count == 12
+        client.head.assert_any_await(
+            "https://gitlab.com/api/v4/projects/group%2Fproject/repository/files/LICENSE",
+            headers={},
+            params={"ref": "main"}
+        )
+
+    def test_check_gitlab_health_network_error(self):
         """Test GitLab health check with network error"""
-        from requests.exceptions import RequestException
-        mock_get.side_effect = RequestException("Network error")
+        client = Mock(get=AsyncMock(side_effect=httpx.RequestError("Network error")))
         
-        policy = Policy()
-        result = check_gitlab_health("group", "project", policy)
+        policy = DEFAULT_POLICY
+        result = asyncio.run(check_gitlab_health(client, "group", "project", policy))
         
         assert result.is_healthy is False
         assert len(result.errors) > 0
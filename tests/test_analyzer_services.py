@@ -1,12 +1,8 @@
 import pytest
 import json
-import tempfile
-import os
-import sys
-from unittest.mock import patch, Mock
-
-# Add the project root to the Python path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import asyncio
+import httpx
+from unittest.mock import AsyncMock, Mock
 
 from analyzer.services.dependency_extractor import (
     extract_requirements_txt_from_content,
@@ -16,6 +12,7 @@ from analyzer.services.dependency_extractor import (
     extract_poetry_lock_from_content
 )
 from analyzer.services.package_info import (
+    canonicalize_pypi_name,
     get_library_info,
     get_npm_info,
     parse_repo_url,
@@ -23,9 +20,21 @@ from analyzer.services.package_info import (
     extract_npm_repo_info,
     get_latest_version_release_date
 )
+from analyzer.services import package_index
 from analyzer.utils.helpers import parse_iso8601_timestamp
 from core.models import Dependency
 from datetime import datetime, timezone
+from types import SimpleNamespace
+
+
+def _registry_response(payload=None, status_code=200, headers=None):
+    """Lightweight stand-in for an httpx.Response from a package registry"""
+    return SimpleNamespace(
+        status_code=status_code,
+        headers=headers if headers is not None else {},
+        content=json.dumps(payload).encode() if payload is not None else b"",
+        raise_for_status=lambda: None
+    )
 
 
 class TestDependencyExtractor:
@@ -45,6 +54,16 @@ class TestDependencyExtractor:
         assert result[2].name == 'flask'
         assert result[2].version is None
 
+    def test_extract_requirements_txt_from_content_whitespace(self):
+        """Test that CRLF endings, indented comments, and padded operators parse like plain lines"""
+        content = "  requests >= 2.0  \r\n   # pinned below\r\n\r\nflask==2.0.1 ; python_version>'3.8'\r\n"
+        result = extract_requirements_txt_from_content(content, include_raw=True)
+
+        assert [(d.name, d.version, d.raw) for d in result] == [
+            ('requests', '2.0', 'requests >= 2.0'),
+            ('flask', "2.0.1 ; python_version>'3.8'", "flask==2.0.1 ; python_version>'3.8'"),
+        ]
+
     def test_extract_package_json_from_content(self):
         """Test extracting package.json from content string"""
         content = """{
@@ -113,52 +132,117 @@ category = "dev"
         assert result[0].version == '2.25.0'
         assert result[0].source == 'poetry.lock'
 
+    def test_extract_from_content_include_raw(self):
+        """Test that raw manifest entries are only kept when requested"""
+        content = "requests==2.25.0\n"
+
+        assert extract_requirements_txt_from_content(content)[0].raw is None
+        assert extract_requirements_txt_from_content(content, include_raw=True)[0].raw == 'requests==2.25.0'
+
+    def test_extract_from_content_is_memoized(self):
+        """Test that repeated content is parsed once and each caller gets its own list"""
+        content = "requests==2.25.0\nflask\n"
+        first = extract_requirements_txt_from_content(content)
+        first.append(Dependency(name='extra'))
+        second = extract_requirements_txt_from_content(content)
+
+        assert len(second) == 2
+        assert second[0] is first[0]
+
 
 class TestPackageInfo:
     """Test package information retrieval"""
 
-    @patch('analyzer.services.package_info.requests.get')
-    def test_get_library_info_success(self, mock_get):
+    def test_get_library_info_success(self):
         """Test successful PyPI library info retrieval"""
-        mock_response = Mock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {"info": {"name": "requests", "version": "2.25.0"}}
-        mock_get.return_value = mock_response
+        mock_response = _registry_response({"info": {"name": "requests", "version": "2.25.0"}})
+        client = Mock(get=AsyncMock(return_value=mock_response))
 
-        result = get_library_info("requests")
+        result = asyncio.run(get_library_info(client, "requests"))
 
         assert result is not None
         assert result["info"]["name"] == "requests"
-        mock_get.assert_called_once_with("https://pypi.org/pypi/requests/json")
+        client.get.assert_awaited_once_with("https://pypi.org/pypi/requests/json", headers={})
+
+    def test_get_library_info_cached(self):
+        """Test repeated PyPI lookups are served from the metadata cache"""
+        mock_response = _registry_response({"info": {"name": "flask", "version": "2.0.0"}}, headers={"Cache-Control": "max-age=900, public"})
+        client = Mock(get=AsyncMock(return_value=mock_response))
+
+        first = asyncio.run(get_library_info(client, "flask"))
+        second = asyncio.run(get_library_info(client, "Flask"))
+
+        assert first == second
+        client.get.assert_awaited_once_with("https://pypi.org/pypi/flask/json", headers={})
+
+    def test_get_library_info_concurrent_lookups_share_request(self):
+        """Test concurrent lookups of one package share a single PyPI request"""
+        mock_response = _registry_response({"info": {"name": "click", "version": "8.1.0"}}, headers={"Cache-Control": "max-age=0"})
+        client = Mock(get=AsyncMock(return_value=mock_response))
+
+        async def lookup_twice():
+            return await asyncio.gather(get_library_info(client, "click"), get_library_info(client, "click"))
 
-    @patch('analyzer.services.package_info.requests.get')
-    def test_get_library_info_failure(self, mock_get):
+        first, second = asyncio.run(lookup_twice())
+
+        assert first == second
+        assert client.get.await_count == 1
+
+    def test_get_library_info_revalidates_stale_entry(self):
+        """Test a stale cache entry is revalidated with a conditional GET"""
+        fresh_response = _registry_response({"info": {"name": "attrs", "version": "21.0.0"}}, headers={"ETag": '"abc"', "Cache-Control": "max-age=0"})
+        not_modified_response = _registry_response(status_code=304)
+        client = Mock(get=AsyncMock(side_effect=[fresh_response, not_modified_response]))
+
+        first = asyncio.run(get_library_info(client, "attrs"))
+        second = asyncio.run(get_library_info(client, "attrs"))
+
+        assert second == first
+        assert client.get.await_args.kwargs["headers"] == {"If-None-Match": '"abc"'}
+
+    def test_get_npm_info_revalidates_stale_entry(self):
+        """Test a stale npm cache entry is revalidated with a conditional GET"""
+        fresh_response = _registry_response({"name": "chalk", "dist-tags": {"latest": "5.3.0"}}, headers={"ETag": '"npm-etag"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT", "Cache-Control": "max-age=0"})
+        not_modified_response = _registry_response(status_code=304)
+        client = Mock(get=AsyncMock(side_effect=[fresh_response, not_modified_response]))
+
+        first = asyncio.run(get_npm_info(client, "chalk"))
+        second = asyncio.run(get_npm_info(client, "chalk"))
+
+        assert second == first
+        assert client.get.await_args.kwargs["headers"] == {
+            "If-None-Match": '"npm-etag"',
+            "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"
+        }
+
+    def test_canonicalize_pypi_name(self):
+        """Test PEP 503 name normalization"""
+        assert canonicalize_pypi_name("Zope.Interface") == "zope-interface"
+        assert canonicalize_pypi_name("typing__extensions") == "typing-extensions"
+
+    def test_get_library_info_failure(self):
         """Test failed PyPI library info retrieval"""
-        from requests.exceptions import RequestException
-        mock_get.side_effect = RequestException("Network error")
+        client = Mock(get=AsyncMock(side_effect=httpx.RequestError("Network error")))
 
-        result = get_library_info("nonexistent")
+        result = asyncio.run(get_library_info(client, "nonexistent"))
 
         assert result is None
 
     def test_get_library_info_invalid_name(self):
         """Test PyPI library info with invalid name"""
         with pytest.raises(ValueError):
-            get_library_info("invalid@name")
+            asyncio.run(get_library_info(Mock(), "invalid@name"))
 
-    @patch('analyzer.services.package_info.requests.get')
-    def test_get_npm_info_success(self, mock_get):
+    def test_get_npm_info_success(self):
         """Test successful npm package info retrieval"""
-        mock_response = Mock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {"name": "express", "version": "4.17.1"}
-        mock_get.return_value = mock_response
+        mock_response = _registry_response({"name": "express", "version": "4.17.1"})
+        client = Mock(get=AsyncMock(return_value=mock_response))
 
-        result = get_npm_info("express")
+        result = asyncio.run(get_npm_info(client, "express"))
 
         assert result is not None
         assert result["name"] == "express"
-        mock_get.assert_called_once_with("https://registry.npmjs.org/express")
+        client.get.assert_awaited_once_with("https://registry.npmjs.org/express", headers={})
 
     def test_parse_repo_url_github(self):
         """Test parsing GitHub repository URL"""
@@ -269,7 +353,57 @@ class TestHelpers:
         assert result.hour == 12
         assert result.tzinfo == timezone.utc
 
+    @pytest.mark.parametrize("timestamp,microsecond", [
+        ("2021-01-01T12:00:00.1Z", 100000),
+        ("2021-01-01T12:00:00.12345Z", 123450),
+    ], ids=["one-digit-fraction", "five-digit-fraction"])
+    def test_parse_iso8601_timestamp_short_fraction(self, timestamp, microsecond):
+        """Test fractions fromisoformat rejects before Python 3.11 still parse"""
+        result = parse_iso8601_timestamp(timestamp)
+
+        assert result == datetime(2021, 1, 1, 12, 0, 0, microsecond, tzinfo=timezone.utc)
+
     def test_parse_iso8601_timestamp_invalid(self):
         """Test parsing invalid timestamp format"""
         with pytest.raises(ValueError):
-            parse_iso8601_timestamp("invalid-timestamp")
\ No newline at end of file
+            parse_iso8601_timestamp("invalid-timestamp")
+
+
+class TestPackageIndex:
+    """Test the persistent package summary index"""
+
+    @pytest.fixture
+    def index_path(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(package_index, 'PACKAGE_INDEX_PATH', str(tmp_path / 'index.sqlite'))
+        monkeypatch.setattr(package_index, '_connection', None)
+        yield
+        package_index._connection.close()
+
+    def test_lookup_disabled_without_path(self, monkeypatch):
+        """Test the index is a no-op when no path is configured"""
+        monkeypatch.setattr(package_index, 'PACKAGE_INDEX_PATH', None)
+        monkeypatch.setattr(package_index, '_connection', None)
+        assert package_index.enabled() is False
+        package_index.record('requests', {"summary": "HTTP"})
+        assert package_index.lookup('requests') is None
+
+    def test_record_and_lookup(self, index_path):
+        """Test a recorded summary is served until it goes stale"""
+        summary = {
+            "summary": "Python HTTP for Humans.",
+            "repository_url": "https://github.com/psf/requests",
+            "repository_platform": "github",
+            "repository_org": "psf",
+            "repository_name": "requests",
+            "latest_version": "2.32.4",
+            "created_date": "2025-06-09T16:43:05.728568Z"
+        }
+        package_index.record('requests', summary)
+
+        assert package_index.enabled() is True
+        assert package_index.lookup('requests') == summary
+        # Same key order as a freshly built summary, so both serialize identically
+        assert list(package_index.lookup('requests')) == list(summary)
+        assert package_index.lookup('flask') is None
+        package_index._connection.execute("UPDATE packages SET updated_at = 0")
+        assert package_index.lookup('requests') is None
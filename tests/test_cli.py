@@ -1,106 +1,104 @@
 import pytest
-import json
-from unittest.mock import patch, MagicMock
+import orjson
+from unittest.mock import patch
 from typer.testing import CliRunner
-import tempfile
 import os
 import jsonschema
 
-# Add the project root to the Python path
-import sys
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from extractor.cli import app
 
 runner = CliRunner()
 
+# JSON Schema for fallback output (since we only have basic extraction now). jsonschema only
+# accepts plain dicts as schemas, so it stays a dict; the compiled validator is what tests share
+FALLBACK_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "version": {"type": ["string", "null"]},
+            "source": {"type": ["string", "null"]},
+            "raw": {"type": ["string", "null"]}
+        },
+        "required": ["name"]
+    }
+}
+# Checked and compiled once at import, instead of on every validation
+jsonschema.Draft202012Validator.check_schema(FALLBACK_SCHEMA)
+FALLBACK_VALIDATOR = jsonschema.Draft202012Validator(FALLBACK_SCHEMA)
+
+
+def _assert_matches_schema(data):
+    """Fail with the schema violations if data doesn't match the fallback schema"""
+    # is_valid stops at the first violation; errors are only collected for the failure message
+    assert FALLBACK_VALIDATOR.is_valid(data), [error.message for error in FALLBACK_VALIDATOR.iter_errors(data)]
+
+
+@pytest.fixture(scope="module")
+def requirements_file(tmp_path_factory):
+    """A requirements.txt manifest shared by the CLI tests that only read it"""
+    path = tmp_path_factory.mktemp("manifests") / "requirements.txt"
+    path.write_bytes(b'requests==2.25.0\ndjango==3.2.0\n')
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def requirements_json_result(requirements_file):
+    """Run --format json on the shared requirements.txt once; the result is shared by every test reading it"""
+    return runner.invoke(app, ['extract', requirements_file, '--format', 'json'], catch_exceptions=False)
+
+
+@pytest.fixture(scope="module")
+def package_json_file(tmp_path_factory):
+    """A package.json manifest shared by the CLI tests that only read it"""
+    path = tmp_path_factory.mktemp("manifests") / "package.json"
+    path.write_bytes(b'{"dependencies": {"express": "^4.17.1"}}')
+    return str(path)
+
+
 class TestJsonFormat:
     """Test the --format json functionality"""
 
-    # JSON Schema for fallback output (since we only have basic extraction now)
-    FALLBACK_SCHEMA = {
-        "type": "array",
-        "items": {
-            "type": "object",
-            "properties": {
-                "name": {"type": "string"},
-                "version": {"type": ["string", "null"]},
-                "source": {"type": ["string", "null"]},
-                "raw": {"type": ["string", "null"]}
-            },
-            "required": ["name"]
-        }
-    }
-
-    def test_json_format_basic_extraction(self):
+    def test_json_format_basic_extraction(self, requirements_json_result):
         """Test JSON format output with basic extraction"""
-        # Create a test requirements file
-        with tempfile.TemporaryDirectory() as temp_dir:
-            test_file = os.path.join(temp_dir, 'requirements.txt')
-            with open(test_file, 'w') as f:
-                f.write('requests==2.25.0\ndjango==3.2.0\n')
-
-            result = runner.invoke(app, ['extract', test_file, '--format', 'json'])
-
-            assert result.exit_code == 0
-
-            # Parse JSON output
-            try:
-                output_json = json.loads(result.output.strip())
-            except json.JSONDecodeError as e:
-                pytest.fail(f"Output is not valid JSON: {e}")
-
-            # Validate against fallback schema
-            try:
-                jsonschema.validate(output_json, self.FALLBACK_SCHEMA)
-            except jsonschema.ValidationError as e:
-                pytest.fail(f"JSON output doesn't match expected schema: {e}")
-
-            # Verify specific structure
-            assert len(output_json) == 2
-            assert output_json[0]["name"] == "requests"
-            assert output_json[1]["name"] == "django"
-
-    def test_human_format_default(self):
-        """Test that human format is used by default (no breaking changes)"""
-        # Create a test requirements file
-        with tempfile.TemporaryDirectory() as temp_dir:
-            test_file = os.path.join(temp_dir, 'requirements.txt')
-            with open(test_file, 'w') as f:
-                f.write('requests==2.25.0\n')
-
-            result = runner.invoke(app, ['extract', test_file])
-
-            assert result.exit_code == 0
-
-            # Verify human-readable output (not JSON)
-            assert "Basic Dependency Extraction" in result.output
-            assert "Found" in result.output
-            assert "=" in result.output  # Header separators
-
-            # Should not be valid JSON
-            with pytest.raises(json.JSONDecodeError):
-                json.loads(result.output.strip())
-
-    def test_human_format_explicit(self):
-        """Test explicit human format option"""
-        # Create a test requirements file
-        with tempfile.TemporaryDirectory() as temp_dir:
-            test_file = os.path.join(temp_dir, 'requirements.txt')
-            with open(test_file, 'w') as f:
-                f.write('requests==2.25.0\n')
-
-            result = runner.invoke(app, ['extract', test_file, '--format', 'human'])
-
-            assert result.exit_code == 0
-
-            # Verify human-readable output
-            assert "Basic Dependency Extraction" in result.output
-            assert "Found" in result.output
+        result = requirements_json_result
+
+        assert result.exit_code == 0
+
+        # Parse JSON output
+        try:
+            output_json = orjson.loads(result.stdout_bytes)
+        except orjson.JSONDecodeError as e:
+            pytest.fail(f"Output is not valid JSON: {e}")
+
+        # Validate against fallback schema
+        _assert_matches_schema(output_json)
+
+        # Verify specific structure
+        assert len(output_json) == 2
+        assert output_json[0]["name"] == "requests"
+        assert output_json[1]["name"] == "django"
+
+    @pytest.mark.parametrize("format_args", [[], ['--format', 'human']], ids=["default", "explicit"])
+    def test_human_format(self, requirements_file, format_args):
+        """Test human format is the default (no breaking changes) and can be selected explicitly"""
+        result = runner.invoke(app, ['extract', requirements_file, *format_args], catch_exceptions=False)
+
+        assert result.exit_code == 0
+
+        # Verify human-readable output (not JSON)
+        assert "Basic Dependency Extraction" in result.output
+        assert "Found" in result.output
+        assert "=" in result.output  # Header separators
+
+        # Should not be valid JSON
+        with pytest.raises(orjson.JSONDecodeError):
+            orjson.loads(result.stdout_bytes)
 
     def test_json_format_help_text(self):
         """Test that help text documents the --format option"""
-        result = runner.invoke(app, ['extract', '--help'])
+        result = runner.invoke(app, ['extract', '--help'], catch_exceptions=False)
 
         assert result.exit_code == 0
         # Strip ANSI color codes for reliable string matching
@@ -110,45 +108,88 @@ class TestJsonFormat:
         assert 'human or json' in clean_output
         assert 'default: human' in clean_output
 
-    def test_json_format_with_file_write_and_validation(self):
+    def test_json_format_with_file_write_and_validation(self, requirements_json_result, tmp_path):
         """Integration test: write JSON to file and validate with schema"""
-        # Create a test requirements file
-        with tempfile.TemporaryDirectory() as temp_dir:
-            test_file = os.path.join(temp_dir, 'requirements.txt')
-            output_file = os.path.join(temp_dir, 'analysis.json')
+        output_file = tmp_path / 'analysis.json'
+        result = requirements_json_result
+
+        assert result.exit_code == 0
 
-            with open(test_file, 'w') as f:
-                f.write('requests==2.25.0\n')
+        # Write output to file
+        output_file.write_bytes(result.stdout_bytes.strip())
 
-            # Run command and capture output to file
-            result = runner.invoke(app, ['extract', test_file, '--format', 'json'])
+        # Read and validate the file
+        file_content = orjson.loads(output_file.read_bytes())
 
-            assert result.exit_code == 0
+        # Validate against schema
+        _assert_matches_schema(file_content)
 
-            # Write output to file
-            with open(output_file, 'w') as f:
-                f.write(result.output.strip())
+        # Verify content
+        assert file_content[0]["name"] == "requests"
+
+    def test_ndjson_format(self, requirements_file):
+        """Test NDJSON output writes one dependency object per line"""
+        result = runner.invoke(app, ['extract', requirements_file, '--format', 'ndjson'], catch_exceptions=False)
+
+        assert result.exit_code == 0
+        lines = [orjson.loads(line) for line in result.stdout_bytes.splitlines()]
+        assert [line["name"] for line in lines] == ["requests", "django"]
+        _assert_matches_schema(lines)
+
+    def test_json_format_multiple_files(self, requirements_file, package_json_file):
+        """Test JSON output for several manifests is one object keyed by path"""
+        result = runner.invoke(app, ['extract', requirements_file, package_json_file, '--format', 'json'], catch_exceptions=False)
+
+        assert result.exit_code == 0
+        by_file = orjson.loads(result.stdout_bytes)
+        assert list(by_file) == [requirements_file, package_json_file]
+        assert by_file[requirements_file][0]["name"] == "requests"
+        assert by_file[package_json_file][0]["name"] == "express"
+        for dependencies in by_file.values():
+            _assert_matches_schema(dependencies)
+
+    def test_json_format_multiple_files_in_worker_processes(self, monkeypatch, requirements_file, package_json_file):
+        """Test parallel extraction produces the same document as inline extraction"""
+        inline = runner.invoke(app, ['extract', requirements_file, package_json_file, '--format', 'json'], catch_exceptions=False)
+        monkeypatch.setattr('extractor.cli._PARALLEL_MIN_FILES', 2)
+        parallel = runner.invoke(app, ['extract', requirements_file, package_json_file, '--format', 'json'], catch_exceptions=False)
+
+        assert parallel.exit_code == 0
+        assert parallel.stdout_bytes == inline.stdout_bytes
+
+    def test_ndjson_format_without_raw(self, package_json_file):
+        """Test that --no-raw leaves raw entries out of the output"""
+        result = runner.invoke(app, ['extract', package_json_file, '--format', 'ndjson', '--no-raw'], catch_exceptions=False)
+
+        assert result.exit_code == 0
+        dep = orjson.loads(result.stdout_bytes)
+        assert dep["name"] == "express"
+        assert dep["raw"] is None
 
-            # Read and validate the file
-            with open(output_file, 'r') as f:
-                file_content = json.load(f)
+    def test_extract_uses_cache_dir(self, monkeypatch, requirements_file, tmp_path):
+        """Test that cached results are reused for unchanged manifests"""
+        cache_dir = tmp_path / 'cache'
+        monkeypatch.setenv('VITALIS_CACHE_DIR', str(cache_dir))
 
-            # Validate against schema
-            jsonschema.validate(file_content, self.FALLBACK_SCHEMA)
+        first = runner.invoke(app, ['extract', requirements_file, '--format', 'json'], catch_exceptions=False)
+        assert first.exit_code == 0
+        assert len(os.listdir(cache_dir)) == 1
 
-            # Verify content
-            assert file_content[0]["name"] == "requests"
+        with patch('extractor.extractor.requirements_txt.extract_requirements_txt') as mock_extract:
+            second = runner.invoke(app, ['extract', requirements_file, '--format', 'json'], catch_exceptions=False)
+            mock_extract.assert_not_called()
+        assert second.output == first.output
 
     def test_health_command(self):
         """Test that health command works"""
-        result = runner.invoke(app, ['health'])
+        result = runner.invoke(app, ['health'], catch_exceptions=False)
 
         assert result.exit_code == 0
         assert 'Vitalis CLI is healthy!' in result.output
 
     def test_health_command_help_text(self):
         """Test that health command help text is properly documented"""
-        result = runner.invoke(app, ['health', '--help'])
+        result = runner.invoke(app, ['health', '--help'], catch_exceptions=False)
 
         assert result.exit_code == 0
         assert 'Check the health of the vitalis CLI' in result.output
\ No newline at end of file
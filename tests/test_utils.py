@@ -1,66 +1,45 @@
 import pytest
-import tempfile
+import hashlib
 import os
-import sys
-from pathlib import Path
 
-# Add the project root to the Python path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from extractor.utils import read_file_text
+from extractor.utils import file_digest, read_file_text
 
 
 class TestUtils:
     """Test utility functions"""
 
-    def test_read_file_text_str_path(self):
-        """Test reading file with string path"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            test_file = os.path.join(temp_dir, 'test.txt')
-            test_content = "Hello, World!\nThis is a test file."
-            
-            with open(test_file, 'w', encoding='utf-8') as f:
-                f.write(test_content)
-
-            result = read_file_text(test_file)
-            assert result == test_content
-
-    def test_read_file_text_path_object(self):
-        """Test reading file with Path object"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            test_file = Path(temp_dir) / 'test.txt'
-            test_content = "Hello, World!\nThis is a test file."
-            
-            with open(test_file, 'w', encoding='utf-8') as f:
-                f.write(test_content)
+    @pytest.mark.parametrize("content,as_path", [
+        ("Hello, World!\nThis is a test file.", False),
+        ("Hello, World!\nThis is a test file.", True),
+        ("Hello, 世界! 🌍", False),
+        ("", False),
+    ], ids=["str-path", "path-object", "utf8-encoding", "empty-file"])
+    def test_read_file_text(self, tmp_path, content, as_path):
+        """Test reading a UTF-8 file given as a string path or Path object"""
+        test_file = tmp_path / 'test.txt'
+        test_file.write_text(content, encoding='utf-8')
 
-            result = read_file_text(test_file)
-            assert result == test_content
+        result = read_file_text(test_file if as_path else str(test_file))
+        assert result == content
 
-    def test_read_file_text_utf8_encoding(self):
-        """Test reading file with UTF-8 encoding"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            test_file = os.path.join(temp_dir, 'test.txt')
-            test_content = "Hello, 世界! 🌍"
-            
-            with open(test_file, 'w', encoding='utf-8') as f:
-                f.write(test_content)
+    def test_read_file_text_file_not_found(self):
+        """Test reading non-existent file raises FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            read_file_text("/non/existent/file.txt")
 
-            result = read_file_text(test_file)
-            assert result == test_content
+    def test_read_file_text_normalizes_newlines(self, tmp_path):
+        """Test reading file translates CRLF and CR newlines like text mode"""
+        test_file = tmp_path / 'test.txt'
+        test_file.write_bytes(b"first\r\nsecond\rthird\n")
 
-    def test_read_file_text_empty_file(self):
-        """Test reading empty file"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            test_file = os.path.join(temp_dir, 'empty.txt')
-            
-            with open(test_file, 'w', encoding='utf-8') as f:
-                pass  # Create empty file
+        result = read_file_text(test_file)
+        assert result == "first\nsecond\nthird\n"
 
-            result = read_file_text(test_file)
-            assert result == ""
+    def test_file_digest_small_and_mapped_files(self, tmp_path):
+        """Test file digest matches BLAKE2b for both read and memory-mapped files"""
+        for size in (10, 1 << 20):
+            test_file = tmp_path / f'{size}.bin'
+            content = os.urandom(size)
+            test_file.write_bytes(content)
 
-    def test_read_file_text_file_not_found(self):
-        """Test reading non-existent file raises FileNotFoundError"""
-        with pytest.raises(FileNotFoundError):
-            read_file_text("/non/existent/file.txt")
\ No newline at end of file
+            assert file_digest(test_file) == hashlib.blake2b(content).hexdigest()[:32]